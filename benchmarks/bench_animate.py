@@ -0,0 +1,63 @@
+"""
+Compares rendering a bias sweep frame by frame through the CLI against the
+animate mode, which reuses one figure and blits every frame. The CLI loop
+is measured in the same process (one cli.main call per frame, with a fresh
+figure and a full savefig) and as separate run_cli.py processes (measured
+on a few frames and extrapolated).
+
+Usage:
+    python benchmarks/bench_animate.py [--frames 40] [--format png] [--process-frames 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+from msm_band_diagram import animate, cli, sweep
+
+def cli_loop(biases, directory):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, bias in enumerate(biases):
+            cli.main(['--bias', str(bias), '--output', os.path.join(directory, f"frame_{i:05d}.png")])
+    return time.perf_counter() - start
+
+def process_loop(biases, directory):
+    start = time.perf_counter()
+    for i, bias in enumerate(biases):
+        subprocess.run([sys.executable, os.path.join(ROOT, 'run_cli.py'), '--bias', str(bias),
+                        '--output', os.path.join(directory, f"process_{i:05d}.png")],
+                       check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame CLI loop vs. animate mode")
+    parser.add_argument('--frames', type=int, default=40, help='Number of frames')
+    parser.add_argument('--format', choices=['png', 'gif'], default='png', help='Animation output format')
+    parser.add_argument('--process-frames', type=int, default=3, help='Frames rendered with separate run_cli.py processes')
+    args = parser.parse_args()
+
+    biases = np.round(np.linspace(-1, 1, args.frames), 6)
+    frames = sweep.expand(dict(cli.DEFAULT_CONFIG), [('bias', list(biases))])
+    with tempfile.TemporaryDirectory() as directory:
+        loop = cli_loop(biases, directory)
+        processes = process_loop(biases[:args.process_frames], directory) * args.frames / args.process_frames
+        output = os.path.join(directory, 'sequence' if args.format == 'png' else 'sweep.gif')
+        animated = animate.render_animation(frames, output, fmt=args.format)
+
+    print(f"{'method':<28} {'time (s)':>10} {'frames/s':>10}")
+    print(f"{'run_cli.py per frame':<28} {processes:>10.2f} {args.frames / processes:>10.1f}")
+    print(f"{'cli.main per frame':<28} {loop:>10.2f} {args.frames / loop:>10.1f}")
+    print(f"{'animate (' + args.format + ')':<28} {animated:>10.2f} {args.frames / animated:>10.1f}")
+    print(f"Speedup: {processes / animated:.1f}x over run_cli.py, {loop / animated:.1f}x over cli.main")
+
+if __name__ == "__main__":
+    main()
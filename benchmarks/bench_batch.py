@@ -0,0 +1,67 @@
+"""
+Compares core.calculate_band_structure_batch against a Python loop over
+core.calculate_band_structure and checks that both give identical results.
+
+Usage:
+    python benchmarks/bench_batch.py [--rows 10000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import core
+
+PROFILE_KEYS = ("E_vac_final", "E_c", "E_v", "E_i", "E_f_quasi")
+
+def make_params(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dtype = [(name, float) for name in core.BATCH_PARAMETERS]
+    params = np.empty(rows, dtype=dtype)
+    params["chi"] = rng.uniform(3.5, 4.5, rows)
+    params["eg"] = rng.uniform(0.6, 3.4, rows)
+    params["fermi_shift"] = rng.uniform(-0.4, 0.4, rows)
+    params["wf_left"] = rng.uniform(4.0, 5.6, rows)
+    params["wf_right"] = rng.uniform(4.0, 5.6, rows)
+    params["bias"] = rng.uniform(-1.0, 1.0, rows)
+    return params
+
+def run_loop(params):
+    results = [core.calculate_band_structure(**{name: float(row[name]) for name in core.BATCH_PARAMETERS})
+               for row in params]
+    return {key: np.stack([r[key] for r in results]) for key in PROFILE_KEYS}
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch vs. loop benchmark for calculate_band_structure")
+    parser.add_argument('--rows', type=int, default=10000, help='Number of parameter sets')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    params = make_params(args.rows)
+    loop_time, loop_result = best_of(lambda: run_loop(params), args.repeat)
+    batch_time, batch_result = best_of(lambda: core.calculate_band_structure_batch(params), args.repeat)
+
+    for key in PROFILE_KEYS:
+        if not np.array_equal(loop_result[key], batch_result[key]):
+            print(f"Mismatch in {key}")
+            sys.exit(1)
+
+    print(f"rows:    {args.rows}")
+    print(f"loop:    {loop_time:.4f} s ({args.rows / loop_time:,.0f} rows/s)")
+    print(f"batch:   {batch_time:.4f} s ({args.rows / batch_time:,.0f} rows/s)")
+    print(f"speedup: {loop_time / batch_time:.1f}x (results identical)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures iv.calculate_iv over many bias points against solving the voltage
+division of the two contacts point by point in Python, and checks that both
+give the same current.
+
+Usage:
+    python benchmarks/bench_iv.py [--points 10000] [--loop-points 200] [--image-force]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import core, iv
+from msm_band_diagram.poisson import K_B
+
+PARAMS = dict(chi=4.05, eg=1.12, fermi_shift=0.2, wf_left=4.6, wf_right=5.0)
+
+def point_by_point(bias_values, image_force, temperature=300.0, richardson=iv.RICHARDSON, doping=1e16, eps_r=11.7):
+    # Bisection on the forward voltage of the right contact, one bias point at a time
+    summary = {name: float(value) for name, value in core.calculate_summary(bias=0.0, **PARAMS).items()}
+    kT = K_B * temperature
+
+    def saturation(side, forward_voltage):
+        barrier = max(summary[f'barrier_{side}'], 0.0)
+        if image_force:
+            barrier -= float(iv.image_force_lowering(summary[f'V_bi_{side}'] - forward_voltage, doping, eps_r))
+        return richardson * temperature ** 2 * math.exp(-barrier / kT)
+
+    currents = []
+    for bias in bias_values:
+        low, high = min(bias, 0.0), max(bias, 0.0)
+        for _ in range(100):
+            x = (low + high) / 2
+            excess = saturation('right', x) * math.expm1(x / kT) + saturation('left', x - bias) * math.expm1((x - bias) / kT)
+            if excess > 0:
+                high = x
+            else:
+                low = x
+            if high - low < 1e-9:
+                break
+        x = (low + high) / 2
+        currents.append(saturation('right', x) * math.expm1(x / kT))
+    return np.array(currents)
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized I-V calculation vs. a per-point loop")
+    parser.add_argument('--points', type=int, default=10000, help='Bias points of the vectorized calculation')
+    parser.add_argument('--loop-points', type=int, default=200, help='Bias points of the per-point loop')
+    parser.add_argument('--image-force', action='store_true', help='Include image-force barrier lowering')
+    args = parser.parse_args()
+
+    bias = np.linspace(-2, 2, args.points)
+    start = time.perf_counter()
+    data = iv.calculate_iv(bias=bias, image_force=args.image_force, **PARAMS)
+    vector_time = time.perf_counter() - start
+
+    loop_bias = np.linspace(-2, 2, args.loop_points)
+    start = time.perf_counter()
+    loop_J = point_by_point(loop_bias, args.image_force)
+    loop_time = time.perf_counter() - start
+
+    reference = iv.calculate_iv(bias=loop_bias, image_force=args.image_force, **PARAMS)["J"]
+    nonzero = loop_bias != 0
+    error = np.max(np.abs(reference[nonzero] / loop_J[nonzero] - 1))
+
+    vector_rate = args.points / vector_time
+    loop_rate = args.loop_points / loop_time
+    print(f"{'method':<24} {'points/s':>14}")
+    print(f"{'calculate_iv':<24} {vector_rate:>14,.0f}")
+    print(f"{'per-point loop':<24} {loop_rate:>14,.0f}")
+    print(f"Speedup: {vector_rate / loop_rate:.0f}x, largest relative difference: {error:.1e}")
+    print(f"J(2 V) = {data['J'][-1]:.4g} A/cm², J(-2 V) = {data['J'][0]:.4g} A/cm²")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measures layers.calculate_stack and plotter.draw_stack against building
+the same stack by concatenating per-layer arrays and drawing one ax.plot
+line per layer and band, for growing numbers of layers.
+
+Usage:
+    python benchmarks/bench_layers.py [--layers 10,100,1000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import layers, plotter
+
+def make_stack(n_layers):
+    stack = [layers.Layer('metal', 10, wf=4.2, label='Al')]
+    for i in range(n_layers):
+        if i % 3 == 2:
+            stack.append(layers.Layer('insulator', 1, chi=0.9, eg=9.0))
+        else:
+            stack.append(layers.Layer('semiconductor', 4, chi=4.05 + 0.05 * (i % 2), eg=1.12 + 0.3 * (i % 2), fermi_shift=0.2))
+    stack.append(layers.Layer('metal', 10, wf=5.1, label='Au'))
+    return stack
+
+def concatenated_loop(stack, bias):
+    # Per-layer arrays joined at the end. Only the flat bulk levels are computed,
+    # so this is a lower bound for a per-layer implementation of the model
+    bounds = np.concatenate([[0.0], np.cumsum([layer.thickness for layer in stack])]) - stack[0].thickness
+    width = bounds[-2]
+    xs, vacs = [], []
+    for i, layer in enumerate(stack):
+        n = layers._layer_points(layer, layers.POINTS_PER_UNIT)
+        x = np.linspace(bounds[i], bounds[i + 1], n)
+        E_f = -bias * np.clip(x, 0, width) / width
+        if layer.kind == 'metal':
+            vac = E_f + layer.wf
+        else:
+            vac = E_f + (layer.chi + layer.eg / 2) - layer.fermi_shift
+        xs.append(x)
+        vacs.append(vac)
+        vacs.append(vac - (layer.chi or 0.0))
+    return np.concatenate(xs), np.concatenate(vacs)
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def draw_per_segment(ax, data):
+    ax.clear()
+    for band, color, linestyle, _ in plotter.StackDiagram.BAND_STYLES:
+        for segment in layers.band_segments(data, band):
+            ax.plot(segment[:, 0], segment[:, 1], color=color, linestyle=linestyle)
+
+def main():
+    parser = argparse.ArgumentParser(description="Layer stack engine and drawing vs. per-layer arrays and lines")
+    parser.add_argument('--layers', type=str, default='10,100,1000', help='Comma-separated numbers of layers between the electrodes')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    fig = plotter.new_figure()
+    ax = fig.add_subplot()
+    print(f"{'layers':>7} {'points':>8} {'engine ms':>10} {'loop ms':>9} {'draw_stack ms':>14} {'ax.plot ms':>11}")
+    for n_layers in (int(v) for v in args.layers.split(',')):
+        stack = make_stack(n_layers)
+        data = layers.calculate_stack(stack, bias=0.5)
+        engine = best_time(lambda: layers.calculate_stack(stack, bias=0.5), args.repeat)
+        loop = best_time(lambda: concatenated_loop(stack, 0.5), args.repeat)
+
+        def collections():
+            plotter.draw_stack(ax, stack, bias=0.5)
+            fig.canvas.draw()
+
+        def lines():
+            draw_per_segment(ax, data)
+            fig.canvas.draw()
+
+        stack_time = best_time(collections, args.repeat)
+        plot_time = best_time(lines, max(1, args.repeat // 2))
+        print(f"{n_layers:>7} {data['x'].size:>8} {engine * 1e3:>10.2f} {loop * 1e3:>9.2f} "
+              f"{stack_time * 1e3:>14.1f} {plot_time * 1e3:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Reports mesh size, memory and render vertices against the maximum
+interpolation error for uniform and adaptive meshes (mesh.band_mesh).
+The error is measured against a 20001-point uniform reference solution.
+
+Usage:
+    python benchmarks/bench_mesh.py [--model simple|poisson] [--bias 0.3]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import core, mesh, plotter
+
+PROFILES = ("E_vac_final", "E_c", "E_v", "E_i", "E_f_quasi")
+
+def result_bytes(data):
+    return sum(v.nbytes for v in data.values() if isinstance(v, np.ndarray))
+
+def render_vertices(params, band_mesh):
+    fig = plotter.new_figure()
+    diagram = plotter.BandDiagram(fig.add_subplot())
+    diagram.update(mesh=band_mesh, **params)
+    lines = sum(len(line.get_xdata()) for line in diagram.ax.get_lines())
+    polys = sum(len(path.vertices) for poly in (diagram.fill_left, diagram.fill_right) for path in poly.get_paths())
+    return lines + polys
+
+def max_error(data, reference):
+    return max(mesh.max_interpolation_error(data["x_semiconductor"], data[name],
+                                            reference["x_semiconductor"], reference[name])
+               for name in PROFILES)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesh size vs. interpolation error")
+    parser.add_argument('--model', choices=['simple', 'poisson'], default='simple', help='Band bending model')
+    parser.add_argument('--bias', type=float, default=0.3, help='Bias voltage (V)')
+    args = parser.parse_args()
+
+    params = {'chi': 4.05, 'eg': 1.12, 'fermi_shift': 0.357 if args.model == 'poisson' else 0.2,
+              'wf_left': 4.2, 'wf_right': 5.1, 'bias': args.bias, 'model': args.model}
+    reference = core.calculate_band_structure(mesh=mesh.uniform_mesh(n_semiconductor=20001), **params)
+
+    cases = [("uniform (default)", None)]
+    cases += [(f"uniform {n}", mesh.uniform_mesh(n_metal=n // 5, n_semiconductor=n)) for n in (100, 2000)]
+    cases += [(f"adaptive tol={tol:g}", mesh.band_mesh(tol=tol, **params)) for tol in (1e-2, 1e-3, 1e-4, 1e-5)]
+    cases += [(f"adaptive budget={n}", mesh.band_mesh(tol=None, max_points=n, **params)) for n in (16, 32, 64)]
+
+    print(f"model={args.model}, bias={args.bias} V")
+    print(f"{'mesh':<24} {'points':>7} {'bytes':>8} {'vertices':>9} {'max error (eV)':>15}")
+    for label, band_mesh in cases:
+        data = core.calculate_band_structure(mesh=band_mesh, **params)
+        points = sum(data[name].size for name in ("x_metal_left", "x_semiconductor", "x_metal_right"))
+        print(f"{label:<24} {points:>7} {result_bytes(data):>8} {render_vertices(params, band_mesh):>9} "
+              f"{max_error(data, reference):>15.2e}")
+
+if __name__ == "__main__":
+    main()
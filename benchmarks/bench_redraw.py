@@ -0,0 +1,73 @@
+"""
+Compares redraws per second of the clear-and-rebuild path
+(plotter.draw_band_diagram) against in-place updates of a
+plotter.BandDiagram, with and without blitting, on an Agg canvas.
+
+Usage:
+    python benchmarks/bench_redraw.py [--frames 200] [--view after]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import plotter
+
+PARAMS = {
+    'chi': 4.05, 'eg': 1.12, 'fermi_shift': 0.2, 'wf_left': 4.2,
+    'label_left': 'Al', 'wf_right': 5.1, 'label_right': 'Au', 'bias': 0.0,
+}
+
+def new_axes():
+    fig = Figure(figsize=(10, 7))
+    FigureCanvasAgg(fig)
+    return fig.add_subplot()
+
+def rebuild(ax, draw, biases):
+    for bias in biases:
+        draw(ax, **dict(PARAMS, bias=bias))
+        ax.figure.canvas.draw()
+
+def in_place(ax, diagram_class, biases, blit):
+    diagram = diagram_class(ax, blit=blit)
+    diagram.update(**dict(PARAMS, bias=biases[0]))
+    ax.figure.canvas.draw()
+    for bias in biases:
+        diagram.update(**dict(PARAMS, bias=bias))
+        if blit:
+            diagram.refresh()
+        else:
+            ax.figure.canvas.draw()
+
+def measure(label, func, frames):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {frames / elapsed:8.1f} redraws/s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Redraw benchmark for plotter")
+    parser.add_argument('--frames', type=int, default=200, help='Number of redraws per path')
+    parser.add_argument('--view', choices=['before', 'after'], default='after', help='Diagram to draw')
+    args = parser.parse_args()
+
+    # Small bias steps, as produced by dragging a slider
+    biases = np.linspace(-0.2, 0.2, args.frames)
+    if args.view == 'before':
+        draw, diagram_class = plotter.draw_pre_junction_diagram, plotter.PreJunctionDiagram
+    else:
+        draw, diagram_class = plotter.draw_band_diagram, plotter.BandDiagram
+
+    base = measure("clear and rebuild", lambda: rebuild(new_axes(), draw, biases), args.frames)
+    update = measure("in-place update", lambda: in_place(new_axes(), diagram_class, biases, False), args.frames)
+    blit = measure("in-place update, blit", lambda: in_place(new_axes(), diagram_class, biases, True), args.frames)
+    print(f"speedup: {base / update:.1f}x (update), {base / blit:.1f}x (blit)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures the memory held by band-structure results: the result objects of
+core (constant levels stored as scalars) in float64 and float32, against
+plain dicts with a full float64 array for every level of the pre-junction
+bands, as the calculators used to return. The shared x-grids are not counted.
+
+Usage:
+    python benchmarks/bench_results.py [--results 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import core
+
+PARAMS = dict(chi=4.05, eg=1.12, fermi_shift=0.2, wf_left=4.6, wf_right=5.0)
+GRIDS = ("x_metal_left", "x_semiconductor", "x_metal_right")
+
+def as_dict(data):
+    # Constant levels expanded into owned arrays, scalars and grids kept as they are
+    return {name: np.array(value, dtype=float) if np.ndim(value) and name not in GRIDS else value
+            for name, value in data.items()}
+
+def dict_bytes(data):
+    return sum(value.nbytes for name, value in data.items() if isinstance(value, np.ndarray) and name not in GRIDS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of result objects vs. per-call dicts")
+    parser.add_argument('--results', type=int, default=1000, help='Number of results per measurement')
+    args = parser.parse_args()
+
+    biases = np.linspace(-1, 1, args.results)
+    rows = []
+    for name, calculate in (('after', core.calculate_band_structure), ('before', core.calculate_pre_junction_bands)):
+        dicts = [as_dict(calculate(bias=bias, **PARAMS)) for bias in biases]
+        rows.append((f"{name}: dict of arrays", sum(dict_bytes(d) for d in dicts), None))
+        for dtype in ('float64', 'float32'):
+            start = time.perf_counter()
+            results = [calculate(bias=bias, dtype=dtype, **PARAMS) for bias in biases]
+            elapsed = time.perf_counter() - start
+            rows.append((f"{name}: result, {dtype}", sum(r.nbytes for r in results), args.results / elapsed))
+
+    print(f"{'container':<28} {'bytes/result':>14} {'results/s':>12}")
+    for label, nbytes, rate in rows:
+        print(f"{label:<28} {nbytes / args.results:>14,.0f} {'' if rate is None else f'{rate:,.0f}':>12}")
+
+if __name__ == "__main__":
+    main()
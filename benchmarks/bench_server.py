@@ -0,0 +1,59 @@
+"""
+Load test for the render service: starts it in-process on a free port and
+sends a dashboard-like burst of concurrent requests (a fraction of them
+repeated), then prints the throughput and the service statistics.
+
+Usage:
+    python benchmarks/bench_server.py [--requests 40] [--unique 20] [--workers 2] [--format png]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import server
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+async def run(args):
+    service = server.RenderService(workers=args.workers)
+    try:
+        start = time.perf_counter()
+        listener = await service.start('127.0.0.1', 0)
+        warm_up = time.perf_counter() - start
+        port = listener.sockets[0].getsockname()[1]
+        endpoint = '/bands' if args.format == 'bands' else f"/render.{args.format}"
+        paths = [f"{endpoint}?bias={(i % args.unique) / args.unique:.4f}" for i in range(args.requests)]
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(fetch(port, path) for path in paths))
+        elapsed = time.perf_counter() - start
+        listener.close()
+    finally:
+        service.close()
+
+    print(f"Worker warm-up: {warm_up:.2f} s")
+    print(f"{args.requests} requests ({args.unique} unique) in {elapsed:.2f} s "
+          f"({args.requests / elapsed:.1f} requests/s), statuses: {sorted(set(statuses))}")
+    print(json.dumps(service.stats(), indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the render service")
+    parser.add_argument('--requests', type=int, default=40, help='Number of concurrent requests')
+    parser.add_argument('--unique', type=int, default=20, help='Number of distinct parameter sets')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--format', choices=['png', 'svg', 'bands'], default='png', help='Requested output')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
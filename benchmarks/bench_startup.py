@@ -0,0 +1,80 @@
+"""
+Measures the start-up cost of run_cli.py: an import-time breakdown
+(python -X importtime) and the wall-clock time of '--help' and of a single
+PNG render. Exits with status 1 when a --max-*-ms limit is exceeded, so
+start-up regressions can be caught in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--top 10]
+                                       [--max-help-ms 150] [--max-render-ms 1500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+RUN_CLI = os.path.join(ROOT, 'run_cli.py')
+
+def import_times(args):
+    """
+    Returns {top-level package: import time in ms} for one run of run_cli.py,
+    summing the self time of every module of the package.
+    """
+    env = dict(os.environ, MPLBACKEND='Agg')
+    result = subprocess.run([sys.executable, '-X', 'importtime', RUN_CLI] + args,
+                            capture_output=True, text=True, env=env, cwd=ROOT)
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        top = name.split('.')[0]
+        totals[top] = totals.get(top, 0.0) + int(self_us) / 1000
+    return totals
+
+def wall_clock(args, repeat):
+    env = dict(os.environ, MPLBACKEND='Agg')
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, RUN_CLI] + args, capture_output=True, env=env, cwd=ROOT, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Start-up benchmark for run_cli.py")
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Number of packages in the import breakdown')
+    parser.add_argument('--max-help-ms', type=float, help='Fail if --help takes longer (ms)')
+    parser.add_argument('--max-render-ms', type=float, help='Fail if a PNG render takes longer (ms)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        render_args = ['--output', os.path.join(tmp, 'startup.png')]
+
+        for label, cli_args in (('--help', ['--help']), ('PNG render', render_args)):
+            totals = import_times(cli_args)
+            print(f"Import time breakdown for {label} (ms, total {sum(totals.values()):.0f} ms):")
+            for name, ms in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"  {name:<24} {ms:8.1f}")
+
+        help_ms = wall_clock(['--help'], args.repeat)
+        render_ms = wall_clock(render_args, args.repeat)
+
+    print(f"Wall clock: --help {help_ms:.0f} ms, PNG render {render_ms:.0f} ms (median of {args.repeat})")
+
+    failed = False
+    if args.max_help_ms is not None and help_ms > args.max_help_ms:
+        print(f"FAIL: --help took {help_ms:.0f} ms (limit {args.max_help_ms:.0f} ms)")
+        failed = True
+    if args.max_render_ms is not None and render_ms > args.max_render_ms:
+        print(f"FAIL: PNG render took {render_ms:.0f} ms (limit {args.max_render_ms:.0f} ms)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Measures configurations per second of core.calculate_summary against
+extracting the same numbers from core.calculate_band_structure_batch, and
+checks that the interface band edges agree exactly.
+
+Usage:
+    python benchmarks/bench_summary.py [--rows 1000000] [--batch-rows 20000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import core
+from bench_batch import make_params
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Closed-form summary vs. full band profiles")
+    parser.add_argument('--rows', type=int, default=1000000, help='Configurations for the summary')
+    parser.add_argument('--batch-rows', type=int, default=20000, help='Configurations for the batch profiles')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions (best time is reported)')
+    args = parser.parse_args()
+
+    params = make_params(args.rows)
+    small = params[:args.batch_rows]
+
+    summary = core.calculate_summary(small)
+    data = core.calculate_band_structure_batch(small)
+    for edge, (profile, index) in {'E_c_left': ('E_c', 0), 'E_c_right': ('E_c', -1),
+                                   'E_v_left': ('E_v', 0), 'E_v_right': ('E_v', -1)}.items():
+        assert np.array_equal(summary[edge], data[profile][:, index]), edge
+
+    summary_time = best_time(lambda: core.calculate_summary(params), args.repeat)
+    batch_time = best_time(lambda: core.calculate_band_structure_batch(small), args.repeat)
+    summary_rate = args.rows / summary_time
+    batch_rate = args.batch_rows / batch_time
+    print(f"{'method':<36} {'configs/s':>14}")
+    print(f"{'calculate_summary':<36} {summary_rate:>14,.0f}")
+    print(f"{'calculate_band_structure_batch':<36} {batch_rate:>14,.0f}")
+    print(f"Speedup: {summary_rate / batch_rate:.0f}x (interface band edges identical)")
+
+if __name__ == "__main__":
+    main()
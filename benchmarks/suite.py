@@ -0,0 +1,206 @@
+"""
+Benchmark suite for the calculation, drawing and saving stages.
+
+Every stage runs at several mesh sizes. Each measurement takes several
+samples of an auto-calibrated number of calls and reports the median time
+per call, the interquartile range, calls per second and the peak memory
+allocated by one call (tracemalloc, measured separately).
+
+Results can be saved as a JSON baseline and compared against it later; the
+run fails (exit status 1) when a stage is slower than the baseline by more
+than the threshold.
+
+Usage:
+    python benchmarks/suite.py [--sizes 100,500,2000] [--samples 7]
+                               [--save baseline.json]
+                               [--compare baseline.json --threshold 0.25]
+                               [--stages core,save]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import matplotlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from msm_band_diagram import cache, core, mesh, plotter
+
+PARAMS = {
+    'chi': 4.05, 'eg': 1.12, 'fermi_shift': 0.2, 'wf_left': 4.2,
+    'label_left': 'Al', 'wf_right': 5.1, 'label_right': 'Au', 'bias': 0.3,
+}
+BATCH_ROWS = 256
+SAVE_FORMATS = ('png', 'jpg', 'svg') # The formats offered by BandDiagramApp.save_plot
+
+def _figure():
+    fig = plotter.new_figure(figsize=(10, 7))
+    return fig, fig.add_subplot()
+
+def make_stages(band_mesh):
+    """
+    Returns {stage name: (setup, call)}. setup() returns the state passed to call(state).
+    """
+    def scalar():
+        return None
+
+    def calculate(_):
+        core.calculate_band_structure(mesh=band_mesh, **PARAMS)
+
+    def batch_setup():
+        return np.linspace(-1, 1, BATCH_ROWS)
+
+    def calculate_batch(biases):
+        core.calculate_band_structure_batch(mesh=band_mesh, **dict(PARAMS, bias=biases))
+
+    def draw_setup():
+        return _figure()[1]
+
+    def draw_after(ax):
+        cache.results.clear() # Measure the full path, not a cache hit
+        plotter.draw_band_diagram(ax, mesh=band_mesh, **PARAMS)
+
+    def draw_before(ax):
+        cache.results.clear()
+        plotter.draw_pre_junction_diagram(ax, mesh=band_mesh, **PARAMS)
+
+    def drawn_setup():
+        fig, ax = _figure()
+        plotter.draw_band_diagram(ax, mesh=band_mesh, **PARAMS)
+        fig.tight_layout(rect=[0, 0, 0.85, 1])
+        return fig
+
+    def redraw(fig):
+        fig.canvas.draw()
+
+    def tight_layout(fig):
+        fig.tight_layout(rect=[0, 0, 0.85, 1])
+
+    def save(fmt):
+        def call(fig):
+            fig.savefig(io.BytesIO(), format=fmt, bbox_inches='tight')
+        return call
+
+    stages = {
+        'core.calculate_band_structure': (scalar, calculate),
+        f'core.calculate_band_structure_batch[{BATCH_ROWS}]': (batch_setup, calculate_batch),
+        'plotter.draw_band_diagram': (draw_setup, draw_after),
+        'plotter.draw_pre_junction_diagram': (draw_setup, draw_before),
+        'figure.redraw': (drawn_setup, redraw),
+        'figure.tight_layout': (drawn_setup, tight_layout),
+    }
+    for fmt in SAVE_FORMATS:
+        stages[f'save.{fmt}'] = (drawn_setup, save(fmt))
+    return stages
+
+def measure(setup, call, samples, min_time):
+    state = setup()
+    call(state) # Warm up (imports, font cache, ...)
+
+    # Calibrate the number of calls per sample to take at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call(state)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            call(state)
+        times.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    call(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    return {
+        'median_s': float(median),
+        'iqr_s': float(q3 - q1),
+        'ops_per_s': float(1 / median),
+        'peak_bytes': int(peak),
+        'calls_per_sample': number,
+        'samples': samples,
+    }
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'platform': platform.platform(),
+    }
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of every stage against the baseline. Returns the
+    names of stages that are slower than the baseline by more than threshold.
+    """
+    regressions = []
+    print(f"\nComparison with baseline (threshold +{threshold:.0%}):")
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            print(f"  {name:<58} new")
+            continue
+        change = result['median_s'] / reference['median_s'] - 1
+        status = 'REGRESSION' if change > threshold else 'ok'
+        print(f"  {name:<58} {change:+7.1%}  {status}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for core, plotter and save paths")
+    parser.add_argument('--sizes', default='100,500,2000', help='Comma-separated semiconductor mesh sizes')
+    parser.add_argument('--samples', type=int, default=7, help='Samples per measurement')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Minimum duration of one sample (s)')
+    parser.add_argument('--stages', help='Only run stages whose name starts with one of these comma-separated prefixes')
+    parser.add_argument('--save', help='Write the results to this JSON file (baseline)')
+    parser.add_argument('--compare', help='Compare against this JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown against the baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.sizes.split(',')]
+    prefixes = args.stages.split(',') if args.stages else None
+
+    results = {}
+    print(f"{'stage':<58} {'median':>10} {'IQR':>10} {'ops/s':>10} {'peak mem':>10}")
+    for n in sizes:
+        band_mesh = mesh.uniform_mesh(n_metal=max(2, n // 5), n_semiconductor=n)
+        for stage, (setup, call) in make_stages(band_mesh).items():
+            if prefixes and not any(stage.startswith(p) for p in prefixes):
+                continue
+            name = f"{stage}[n={n}]"
+            result = measure(setup, call, args.samples, args.min_time)
+            results[name] = result
+            print(f"{name:<58} {result['median_s'] * 1e3:>8.3f}ms {result['iqr_s'] * 1e3:>8.3f}ms "
+                  f"{result['ops_per_s']:>10.1f} {result['peak_bytes'] / 1024:>8.0f}KB")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed beyond {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import os
+import shutil
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+from matplotlib.lines import Line2D
+from matplotlib.text import Text
+
+from . import cache, plotter, profiling
+
+FORMATS = ('gif', 'mp4', 'png')
+
+class GifWriter:
+    """
+    Streams frames to an animated GIF. Every frame is mapped to the palette
+    of the first frame as it arrives, which becomes the global color table,
+    and only the region that changed since the previous frame is encoded and
+    written right away, so memory does not grow with the number of frames.
+    """
+    def __init__(self, path, size, fps):
+        self.duration = round(1000 / fps)
+        self._file = open(path, 'wb')
+        self._palette = None
+        self._previous = None
+
+    def write(self, rgba):
+        image = Image.fromarray(rgba).convert('RGB')
+        if self._palette is None:
+            self._palette = image.quantize(colors=256)
+            # The header may normalize the image it is given, so it gets a copy
+            header, _ = GifImagePlugin.getheader(self._palette.copy(), info={'loop': 0})
+            self._file.writelines(header)
+            frame = self._palette
+        else:
+            frame = image.quantize(palette=self._palette, dither=Image.Dither.NONE)
+        indices = np.asarray(frame)
+        box = (0, 0) + frame.size
+        if self._previous is not None:
+            # Frames are drawn over the previous one, so the unchanged border can be left out
+            changed = indices != self._previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            columns = np.flatnonzero(changed.any(axis=0))
+            box = (columns[0], rows[0], columns[-1] + 1, rows[-1] + 1) if rows.size else (0, 0, 1, 1)
+        self._previous = indices
+        self._file.writelines(GifImagePlugin.getdata(frame.crop(box), offset=box[:2], duration=self.duration))
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._palette is not None:
+            self._file.write(b';') # GIF trailer
+        self._file.close()
+
+class FFmpegWriter:
+    """
+    Streams raw RGBA frames to an ffmpeg process through a pipe, which encodes
+    them as H.264 MP4. Requires the ffmpeg executable on PATH.
+    """
+    def __init__(self, path, size, fps):
+        executable = shutil.which('ffmpeg')
+        if executable is None:
+            raise RuntimeError("MP4 output requires ffmpeg, which was not found on PATH")
+        width, height = size
+        command = [
+            executable, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+            # H.264 with yuv420p needs even dimensions
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264', '-pix_fmt', 'yuv420p', path,
+        ]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self._process.stdin.write(rgba.tobytes())
+
+    def close(self):
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed with exit status {self._process.returncode}")
+
+class PngSequenceWriter:
+    """
+    Writes every frame as a numbered PNG file (frame_00000.png, ...) into a
+    directory. Frames are encoded on a background thread (Pillow releases the
+    GIL while compressing), so encoding overlaps with rendering the next frame.
+    """
+    MAX_PENDING = 2
+
+    def __init__(self, path, size, fps):
+        self.path = path
+        self._index = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = deque()
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def _save(rgba, path):
+        Image.fromarray(rgba).save(path, compress_level=1)
+
+    def write(self, rgba):
+        # The canvas buffer is reused by the next frame, so the thread gets a copy
+        path = os.path.join(self.path, f"frame_{self._index:05d}.png")
+        self._pending.append(self._executor.submit(self._save, rgba.copy(), path))
+        self._index += 1
+        while len(self._pending) > self.MAX_PENDING:
+            self._pending.popleft().result()
+
+    def close(self):
+        while self._pending:
+            self._pending.popleft().result()
+        self._executor.shutdown()
+
+WRITERS = {
+    'gif': GifWriter,
+    'mp4': FFmpegWriter,
+    'png': PngSequenceWriter,
+}
+
+def output_format(path):
+    """
+    Returns the format implied by the output path: its extension, or a PNG
+    sequence for a path without extension (a directory).
+    """
+    extension = os.path.splitext(path)[1][1:].lower()
+    return extension or 'png'
+
+def _artist_state(artist):
+    if isinstance(artist, Text):
+        return artist.get_text(), artist.get_position()
+    if isinstance(artist, Line2D):
+        return artist.get_xydata().tobytes()
+    return tuple(path.vertices.tobytes() for path in artist.get_paths())
+
+def _static_artists(diagram, results, frames):
+    # Artists that look the same in every frame can be drawn once, into the background
+    diagram.set_data(results[0], **frames[0])
+    first = [_artist_state(artist) for artist in diagram.artists]
+    static = set(diagram.artists)
+    for data, config in zip(results[1:], frames[1:]):
+        diagram.set_data(data, **config)
+        for artist, state in zip(diagram.artists, first):
+            if artist in static and _artist_state(artist) != state:
+                static.discard(artist)
+        if not static:
+            break
+    return static
+
+def _union_limits(diagram, results):
+    x_ranges, ylims = zip(*(diagram.limits(data) for data in results))
+    x_range = (min(x[0] for x in x_ranges), max(x[1] for x in x_ranges))
+    ylim = (min(y[0] for y in ylims), max(y[1] for y in ylims))
+    return x_range, ylim
+
+def render_animation(frames, output, fmt=None, fps=20, figsize=(10, 7), dpi=100, progress=None):
+    """
+    Renders one frame per configuration and streams the frames to a GIF, MP4
+    or PNG-sequence writer.
+
+    A single figure is used for all frames. The axes limits are fixed to the
+    union over all frames up front, so the static parts (axes, grid, legend,
+    and every line, polygon or label that is the same in all frames) are
+    drawn once. Every frame only restores that background and redraws the
+    changing artists before the pixels are handed to the writer.
+
+    Args:
+        frames (list): Configurations as returned by sweep.expand. All frames
+                       must use the same view; layer stacks are not supported.
+        output (str): Output file (.gif, .mp4) or directory (PNG sequence).
+        fmt (str, optional): One of FORMATS. Defaults to output_format(output).
+        fps (float): Frames per second.
+        figsize (tuple): Figure size in inches.
+        dpi (int): Resolution; the frame size is figsize * dpi pixels.
+        progress (callable, optional): Called as progress(done, total) after each frame.
+
+    Returns:
+        float: Elapsed wall-clock time in seconds.
+    """
+    fmt = fmt or output_format(output)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported animation format '{fmt}', expected one of {', '.join(FORMATS)}")
+    if not frames:
+        raise ValueError("No frames to render")
+    if any(config.get('layers') for config in frames):
+        raise ValueError("Animations of layer stacks are not supported")
+    frames = [dict(config) for config in frames]
+    views = {config.pop('view', 'after') for config in frames}
+    for config in frames:
+        config.pop('output', None)
+    if len(views) > 1:
+        raise ValueError("All frames of an animation must use the same view")
+    view = views.pop()
+
+    start = time.perf_counter()
+    calculate = cache.calculate_pre_junction_bands if view == 'before' else cache.calculate_band_structure
+    with profiling.span('animate.calculate'):
+        results = [calculate(**config) for config in frames]
+
+    fig = plotter.new_figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    diagram_class = plotter.PreJunctionDiagram if view == 'before' else plotter.BandDiagram
+    diagram = diagram_class(ax, blit=True)
+    diagram.fix_limits(*_union_limits(diagram, results))
+    diagram.set_static(_static_artists(diagram, results, frames))
+
+    # The first frame decides the layout; the full draw caches the background
+    diagram.set_data(results[0], **frames[0])
+    fig.tight_layout(rect=[0, 0, 0.85, 1])
+    fig.canvas.draw()
+    canvas = fig.canvas
+    size = canvas.get_width_height()
+
+    writer = WRITERS[fmt](output, size, fps)
+    try:
+        for i, (data, config) in enumerate(zip(results, frames)):
+            with profiling.span('animate.frame'):
+                if i > 0:
+                    diagram.set_data(data, **config)
+                    diagram.refresh()
+                writer.write(np.asarray(canvas.buffer_rgba()))
+            if progress is not None:
+                progress(i + 1, len(frames))
+    finally:
+        with profiling.span('animate.close'):
+            writer.close()
+    return time.perf_counter() - start
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import core
+
+# Parameters that do not change the physics (labels and CLI options)
+NON_PHYSICAL_KEYS = frozenset({'label_left', 'label_right', 'view', 'output'})
+
+class LRUCache:
+    """
+    Mapping with least-recently-used eviction, bounded by the number of entries
+    and by the total size in bytes. Keeps hit/miss statistics.
+    """
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, nbytes=0):
+        """
+        Stores value under key. Values larger than max_bytes are not stored.
+        """
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, nbytes)
+            self._bytes += nbytes
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._data.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns a dict with hits, misses, hit_rate, evictions, entries and bytes.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._data),
+            'bytes': self._bytes,
+        }
+
+def _hashable(value):
+    # Lists and arrays (e.g. from a JSON configuration) as tuples, dicts as sorted item tuples
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+def physics_key(params, exclude=()):
+    """
+    Returns a hashable key of the numeric physics parameters. Labels and
+    CLI-only options are left out, so they do not cause cache misses.
+    """
+    return tuple(sorted((k, _hashable(v)) for k, v in params.items()
+                        if k not in NON_PHYSICAL_KEYS and k not in exclude))
+
+# Default cache shared by the module-level functions
+results = LRUCache()
+
+def _cached(view, calculate, params, exclude=()):
+    key = (view,) + physics_key(params, exclude)
+    data = results.get(key)
+    if data is None:
+        data = calculate(**params)
+        # Cached results are shared between callers, so their arrays are made
+        # read-only; only the owned arrays count, the x-grids are shared anyway
+        results.put(key, data, data.freeze())
+    return data
+
+def calculate_band_structure(**params):
+    """
+    Cached version of core.calculate_band_structure. The result is shared
+    with other callers and its arrays are read-only.
+    """
+    return _cached('after', core.calculate_band_structure, params)
+
+def calculate_pre_junction_bands(**params):
+    """
+    Cached version of core.calculate_pre_junction_bands. The result is shared
+    with other callers and its arrays are read-only.
+    The bias does not affect the result and is not part of the key.
+    """
+    return _cached('before', core.calculate_pre_junction_bands, params, exclude=('bias',))
+
+def stats():
+    """
+    Returns the hit/miss statistics of the band-structure cache.
+    """
+    return results.stats()
+
+class ImageCache:
+    """
+    On-disk cache of rendered image bytes (PNG, SVG, ...), keyed by a hash of
+    the full configuration including labels. When the directory grows beyond
+    max_bytes, the least recently used files are deleted.
+    """
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(config, fmt):
+        text = json.dumps({'config': config, 'format': fmt}, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, config, fmt):
+        return os.path.join(self.directory, f"{self.key(config, fmt)}.{fmt}")
+
+    def get(self, config, fmt):
+        """
+        Returns the cached image bytes, or None.
+        """
+        path = self._path(config, fmt)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path) # Mark as recently used
+        self.hits += 1
+        return data
+
+    def put(self, config, fmt, data):
+        path = self._path(config, fmt)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path) # Atomic, so readers never see partial files
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
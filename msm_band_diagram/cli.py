@@ -1,11 +1,43 @@
 import argparse
-import matplotlib.pyplot as plt
+import io
+import os
+import sys
 import json
-from . import plotter
 
-def main():
-    parser = argparse.ArgumentParser(description="Band Diagram Plotter (CUI)", conflict_handler='resolve')
-    
+from . import profiling
+
+# matplotlib, numpy and the drawing modules are imported only when a diagram
+# is actually drawn, so --help, argument errors and cached renders start fast.
+
+# Used when no display is available and no output file was given
+HEADLESS_OUTPUT = 'band_diagram.png'
+
+# Default parameters
+DEFAULT_CONFIG = {
+    'view': 'after',
+    'chi': 4.05,
+    'eg': 1.12,
+    'fermi_shift': 0.2,
+    'wf_left': 4.2,
+    'label_left': 'Al',
+    'wf_right': 5.1,
+    'label_right': 'Au',
+    'bias': 0.0,
+    'model': 'simple',
+    'doping': 1e16,
+    'eps_r': 11.7,
+    'temperature': 300.0,
+    'length': 1.0,
+    'output': None
+}
+
+# Configuration keys that name a material (see materials.CONFIG_KEYS)
+MATERIAL_KEYS = ('left', 'right', 'semiconductor')
+
+def add_parameter_arguments(parser):
+    """
+    Adds the --json file argument and the physical parameter arguments shared by all modes.
+    """
     # Add config file argument first
     parser.add_argument('--json', dest='config', type=str, help='Path to the configuration file (JSON format)')
 
@@ -19,23 +51,24 @@ def main():
     parser.add_argument('--wf-right', dest='wf_right', type=float, help='Work function of the right electrode (eV)')
     parser.add_argument('--label-right', dest='label_right', type=str, help='Label for the right electrode')
     parser.add_argument('--bias', dest='bias', type=float, help='Bias voltage (V)')
-    parser.add_argument('--output', dest='output', type=str, help='Output filename (e.g., band_diagram.png)')
+    parser.add_argument('--model', dest='model', choices=['simple', 'poisson'], help='Band bending model: fixed-length exponential (simple) or self-consistent Poisson solution (poisson)')
+    parser.add_argument('--doping', dest='doping', type=float, help='Dopant density (cm^-3, poisson model)')
+    parser.add_argument('--eps-r', dest='eps_r', type=float, help='Relative permittivity of the semiconductor (poisson model)')
+    parser.add_argument('--temperature', dest='temperature', type=float, help='Temperature (K, poisson model)')
+    parser.add_argument('--length', dest='length', type=float, help='Width of the semiconductor (um, poisson model)')
 
-    args = parser.parse_args()
-
-    # Default parameters
-    config = {
-        'view': 'after',
-        'chi': 4.05,
-        'eg': 1.12,
-        'fermi_shift': 0.2,
-        'wf_left': 4.2,
-        'label_left': 'Al',
-        'wf_right': 5.1,
-        'label_right': 'Au',
-        'bias': 0.0,
-        'output': None
-    }
+    # Material names, resolved through the material library
+    parser.add_argument('--left', dest='left', type=str, help='Left electrode metal from the material library (sets its work function and label)')
+    parser.add_argument('--right', dest='right', type=str, help='Right electrode metal from the material library')
+    parser.add_argument('--semiconductor', dest='semiconductor', type=str, help='Semiconductor from the material library (sets chi, eg and eps_r)')
+    parser.add_argument('--materials', dest='materials', action='append', metavar='PATH', help='Additional material file (JSON) that overrides the library; can be repeated')
+
+def load_config(args):
+    """
+    Merges the defaults, the JSON file given by --json and the command-line arguments.
+    Returns None (after printing an error) if the JSON file cannot be read.
+    """
+    config = dict(DEFAULT_CONFIG)
 
     # Load from config file if specified
     if args.config:
@@ -44,36 +77,464 @@ def main():
                 config.update(json.load(f))
         except FileNotFoundError:
             print(f"Error: JSON file not found at {args.config}")
-            return
+            return None
         except json.JSONDecodeError:
             print(f"Error: Could not decode JSON from {args.config}")
-            return
+            return None
 
     # Create a dictionary from the parsed args, excluding None values
     # argparse converts hyphens to underscores automatically.
-    cli_args = {k: v for k, v in vars(args).items() if v is not None and k != 'config'}
-    
+    cli_args = {k: v for k, v in vars(args).items() if v is not None and k in DEFAULT_CONFIG}
+
+    # Material names (from the JSON file or the command line) supply numbers,
+    # which explicit numeric arguments still override
+    names = {key: config.pop(key) for key in MATERIAL_KEYS if key in config}
+    names.update({key: getattr(args, key) for key in MATERIAL_KEYS if getattr(args, key, None) is not None})
+    if any(value is not None for value in names.values()):
+        from . import materials
+        if getattr(args, 'materials', None):
+            materials.add_overrides(args.materials)
+        try:
+            config.update(materials.resolve(names))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
+
     # Update config with CLI arguments, giving CLI precedence
     config.update(cli_args)
+    return config
+
+def sweep_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py sweep', description="Render band diagrams for every combination of swept parameters")
+    add_parameter_arguments(parser)
+    parser.add_argument('specs', nargs='+', metavar='KEY=VALUES',
+                        help='Swept parameter, as a range start:stop:step (stop included) or a comma-separated list, '
+                             'e.g. bias=-1:1:0.05 or wf_right=4.5,5.1,5.6')
+    parser.add_argument('--output-dir', dest='output_dir', type=str, default='sweep_output', help='Directory for the rendered images')
+    parser.add_argument('--format', dest='format', choices=['png', 'jpg', 'svg'], default='png', help='Image format')
+    parser.add_argument('--workers', dest='workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--store', dest='store', type=str, help='Write the band profiles to a memory-mapped result store in this directory instead of rendering images (resumes an interrupted run)')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, default=1024, help='Rows calculated per batch when writing a store')
+    parser.add_argument('--store-dtype', dest='store_dtype', choices=['float64', 'float32'], default='float64', help='Precision of a new result store (float32 halves its size)')
+    args = parser.parse_args(argv)
+
+    config = load_config(args)
+    if config is None:
+        return
+    config.pop('output', None)
+
+    from . import sweep
+    try:
+        specs = [sweep.parse_spec(text, config) for text in args.specs]
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    jobs = sweep.expand(config, specs)
+    if args.store:
+        return write_store(args.store, jobs, args.batch_size, args.store_dtype)
+    try:
+        elapsed = sweep.render_sweep(jobs, args.output_dir, fmt=args.format, workers=args.workers)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    print(f"Rendered {len(jobs)} images to {args.output_dir} in {elapsed:.2f} s ({len(jobs) / elapsed:.1f} images/s)")
+
+def animate_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py animate', description="Render an animation of the band diagram while parameters are swept")
+    add_parameter_arguments(parser)
+    parser.add_argument('specs', nargs='+', metavar='KEY=VALUES',
+                        help='Swept parameter, as in sweep mode (e.g. bias=-1:1:0.02). '
+                             'Several parameters are animated in the order of their combinations')
+    parser.add_argument('--output', dest='output', type=str, required=True,
+                        help='Output file (.gif or .mp4) or directory for a PNG sequence')
+    parser.add_argument('--format', dest='format', choices=['gif', 'mp4', 'png'], help='Output format (default: from the output extension)')
+    parser.add_argument('--fps', dest='fps', type=float, default=20, help='Frames per second')
+    parser.add_argument('--dpi', dest='dpi', type=int, default=100, help='Resolution (a frame is 10x7 inches)')
+    args = parser.parse_args(argv)
+
+    config = load_config(args)
+    if config is None:
+        return
+    config.pop('output', None)
+
+    from . import animate, sweep
+    try:
+        specs = [sweep.parse_spec(text, config) for text in args.specs]
+        frames = sweep.expand(config, specs)
+        elapsed = animate.render_animation(frames, args.output, fmt=args.format, fps=args.fps, dpi=args.dpi)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        return
+    print(f"Rendered {len(frames)} frames to {args.output} in {elapsed:.2f} s ({len(frames) / elapsed:.1f} frames/s)")
+
+def summary_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py summary', description="Write closed-form figures of merit (barrier heights, built-in potentials, interface band edges, contact types) for every combination of swept parameters")
+    add_parameter_arguments(parser)
+    parser.add_argument('specs', nargs='*', metavar='KEY=VALUES',
+                        help='Swept parameter, as in sweep mode (e.g. wf_right=4:6:0.001). Without any, one row is written')
+    parser.add_argument('--output', dest='output', type=str, default='-', help='Output file (default: CSV to standard output)')
+    parser.add_argument('--format', dest='format', choices=['csv', 'parquet'], help='Output format (default: from the output extension, parquet requires pyarrow)')
+    parser.add_argument('--chunk-size', dest='chunk_size', type=int, default=65536, help='Rows evaluated and written per chunk')
+    args = parser.parse_args(argv)
+
+    config = load_config(args)
+    if config is None:
+        return
+    config.pop('output', None)
+
+    from . import summary, sweep
+    fmt = args.format or ('parquet' if args.output.lower().endswith('.parquet') else 'csv')
+    try:
+        specs = [sweep.parse_spec(text, config) for text in args.specs]
+        rows, elapsed = summary.write_summary(config, specs, args.output, fmt=fmt, chunk_size=args.chunk_size)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return
+    if args.output != '-':
+        print(f"Wrote {rows} rows to {args.output} in {elapsed:.2f} s ({rows / elapsed:.0f} rows/s)")
+
+def design_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py design', description="Search electrode work functions and doping for target barrier heights and contact types")
+    add_parameter_arguments(parser)
+    parser.add_argument('specs', nargs='*', metavar='KEY=VALUES',
+                        help='Candidate values of wf_left, wf_right or fermi_shift, as in sweep mode (e.g. wf_right=4:6:0.01). '
+                             'Parameters without candidates keep their configured value')
+    parser.add_argument('--metals', dest='metals', type=str, help='Candidate electrode metals for both sides, e.g. Al=4.28,Ti=4.33,Au=5.1 (replaces the work function candidates)')
+    parser.add_argument('--barrier-left', dest='barrier_left', type=float, help='Target majority-carrier barrier at the left contact (eV)')
+    parser.add_argument('--barrier-right', dest='barrier_right', type=float, help='Target majority-carrier barrier at the right contact (eV)')
+    parser.add_argument('--contact-left', dest='contact_left', choices=['ohmic', 'rectifying'], help='Required behavior of the left contact')
+    parser.add_argument('--contact-right', dest='contact_right', choices=['ohmic', 'rectifying'], help='Required behavior of the right contact')
+    parser.add_argument('--top', dest='top', type=int, default=10, help='Number of candidates to list')
+    parser.add_argument('--render-dir', dest='render_dir', type=str, help='Render the band diagrams of the listed candidates into this directory')
+    args = parser.parse_args(argv)
+
+    config = load_config(args)
+    if config is None:
+        return
+    config.pop('output', None)
+
+    from . import design, sweep
+    if config.get('layers'):
+        print("Error: design mode does not support layer stacks")
+        return
+    try:
+        specs = dict(sweep.parse_spec(text, config) for text in args.specs)
+        for key in specs:
+            if key not in ('wf_left', 'wf_right', 'fermi_shift'):
+                raise ValueError(f"Cannot search over '{key}', give candidates for wf_left, wf_right or fermi_shift")
+        metals = None
+        if args.metals:
+            metals = {}
+            for item in args.metals.split(','):
+                label, sep, wf = item.partition('=')
+                if not sep:
+                    raise ValueError(f"Invalid metal '{item}', expected LABEL=WORK_FUNCTION")
+                metals[label.strip()] = float(wf)
+        results = design.search(config['chi'], config['eg'],
+                                specs.get('wf_left', config['wf_left']), specs.get('wf_right', config['wf_right']),
+                                specs.get('fermi_shift', config['fermi_shift']), bias=config['bias'],
+                                barrier_left=args.barrier_left, barrier_right=args.barrier_right,
+                                contact_left=args.contact_left, contact_right=args.contact_right,
+                                metals=metals, top_k=args.top)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if not results:
+        print("No candidate meets the contact requirements")
+        return
+
+    print(f"{'rank':>4} {'score':>8} {'left':>10} {'right':>10} {'fermi_shift':>11} {'barrier_left':>12} {'barrier_right':>13}  contacts")
+    for result in results:
+        params = result['params']
+        left = params.get('label_left', f"{params['wf_left']:.3f}")
+        right = params.get('label_right', f"{params['wf_right']:.3f}")
+        contacts = '/'.join('ohmic' if result[name] else 'rectifying' for name in ('ohmic_left', 'ohmic_right'))
+        print(f"{result['rank']:>4} {result['score']:>8.4f} {left:>10} {right:>10} {params['fermi_shift']:>11.3f} "
+              f"{result['barrier_left']:>12.4f} {result['barrier_right']:>13.4f}  {contacts}")
+
+    if args.render_dir:
+        jobs = []
+        for result in results:
+            job = dict(config, **result['params'])
+            if metals is None: # The configured labels name other metals
+                job['label_left'] = f"{job['wf_left']:g} eV"
+                job['label_right'] = f"{job['wf_right']:g} eV"
+            jobs.append(job)
+        elapsed = sweep.render_sweep(jobs, args.render_dir, workers=1)
+        print(f"Rendered {len(jobs)} band diagrams to {args.render_dir} in {elapsed:.2f} s")
+
+def materials_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py materials', description="List or search the material library")
+    parser.add_argument('category', nargs='?', choices=['metals', 'semiconductors', 'insulators'], default='metals', help='Material category')
+    parser.add_argument('--where', dest='where', action='append', default=[], metavar='PROPERTY=MIN:MAX',
+                        help='Property range, either end may be empty (e.g. wf=4.2:5 or eg=:1.5); can be repeated')
+    parser.add_argument('--spec', dest='spec', type=str, metavar='KEY',
+                        help='Also print the matching values as a sweep specification for KEY (e.g. wf_right)')
+    parser.add_argument('--materials', dest='materials', action='append', metavar='PATH', help='Additional material file (JSON) that overrides the library; can be repeated')
+    args = parser.parse_args(argv)
+
+    from . import materials
+    if args.materials:
+        materials.add_overrides(args.materials)
+    try:
+        ranges = {}
+        for text in args.where:
+            prop, sep, bounds = text.partition('=')
+            low, colon, high = bounds.partition(':')
+            if not sep or not colon:
+                raise ValueError(f"Invalid range '{text}', expected PROPERTY=MIN:MAX")
+            ranges[prop.strip()] = (float(low) if low.strip() else None, float(high) if high.strip() else None)
+        matches = materials.search(args.category, **ranges)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    properties = materials.CATEGORIES[args.category]
+    print(f"{'label':<10} " + ' '.join(f"{prop:>7}" for prop in properties) + "  name")
+    for entry in matches:
+        print(f"{entry['label']:<10} " + ' '.join(f"{entry[prop]:>7g}" for prop in properties) + f"  {entry['name']}")
+    if args.spec:
+        prop = args.spec.replace('-', '_')
+        prop = 'wf' if prop in ('wf_left', 'wf_right') else prop
+        if prop not in properties:
+            print(f"Error: {args.spec} is not a property of {args.category}")
+            return
+        print(f"{args.spec}=" + ','.join(f"{value:g}" for value in sorted({entry[prop] for entry in matches})))
+
+def iv_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py iv', description="Calculate the current-voltage characteristic (back-to-back thermionic emission) and draw it next to the band diagram")
+    add_parameter_arguments(parser)
+    parser.add_argument('--bias-range', dest='bias_range', type=str, default='-2:2:0.001',
+                        help='Bias values, as a range or list (e.g. --bias-range=-5:5:0.001). The band diagram is drawn at --bias')
+    parser.add_argument('--richardson', dest='richardson', type=float, default=120.0, help='Effective Richardson constant (A cm^-2 K^-2)')
+    parser.add_argument('--area', dest='area', type=float, default=1e-4, help='Contact area (cm^2)')
+    parser.add_argument('--image-force', dest='image_force', action='store_true', help='Include image-force barrier lowering (uses --doping and --eps-r)')
+    parser.add_argument('--linear', dest='linear', action='store_true', help='Plot J on a linear instead of a logarithmic axis')
+    parser.add_argument('--output', dest='output', type=str, help='Output image with the band diagram and the I-V curve')
+    parser.add_argument('--export', dest='export', type=str, help='Write the curve to a .csv or .npz file')
+    args = parser.parse_args(argv)
 
-    fig, ax = plt.subplots(figsize=(10, 7))
-    
-    # Separate view and output file from drawing parameters
+    config = load_config(args)
+    if config is None:
+        return
+    config.pop('output', None)
+    config.pop('view', None)
+
+    import time
+    import numpy as np
+    from . import iv, plotter, sweep
+    try:
+        bias = np.array(sweep.parse_spec(f"bias={args.bias_range}", config)[1])
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    output_file = args.output
+    if not output_file and not args.export:
+        output_file = 'iv.png'
+        print(f"No --output or --export given, saving to {output_file}")
+    start = time.perf_counter()
+    data = iv.calculate_iv(bias=bias, richardson=args.richardson, area=args.area, image_force=args.image_force,
+                           **{key: value for key, value in config.items() if key != 'bias'})
+    elapsed = time.perf_counter() - start
+    print(f"Calculated {bias.size} bias points in {elapsed * 1e3:.1f} ms")
+    J_max, J_min = data["J"][np.argmax(bias)], data["J"][np.argmin(bias)]
+    print(f"J({bias.max():g} V) = {J_max:.4g} A/cm², J({bias.min():g} V) = {J_min:.4g} A/cm²")
+
+    if args.export:
+        iv.save_iv(args.export, data)
+        print(f"I-V curve saved to {args.export}")
+    if output_file:
+        fig = plotter.new_figure(figsize=(16, 7))
+        band_ax, iv_ax = fig.subplots(1, 2, gridspec_kw={'width_ratios': [3, 2]})
+        plotter.draw_band_diagram(band_ax, **config)
+        plotter.draw_iv(iv_ax, data, bias=config['bias'], log=not args.linear)
+        fig.tight_layout()
+        fig.savefig(output_file, bbox_inches='tight')
+        print(f"Band diagram and I-V curve saved to {output_file}")
+
+def serve_main(argv):
+    parser = argparse.ArgumentParser(prog='run_cli.py serve', description="Serve band diagrams over HTTP from a pool of worker processes")
+    parser.add_argument('--host', dest='host', type=str, default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', dest='port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--workers', dest='workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--cache-mb', dest='cache_mb', type=float, default=256, help='Size of the in-memory result cache (MB)')
+    args = parser.parse_args(argv)
+
+    import asyncio
+    from . import server
+    try:
+        asyncio.run(server.serve(args.host, args.port, workers=args.workers, cache_bytes=int(args.cache_mb * 1024 * 1024)))
+    except OSError as e:
+        print(f"Error: {e}")
+    except KeyboardInterrupt:
+        pass
+
+def write_store(path, jobs, batch_size, dtype='float64'):
+    """
+    Calculates the jobs into a result store at path, resuming an existing store
+    if it was created for the same parameters (dtype only applies to a new store).
+    """
+    import numpy as np
+    from . import store
+    try:
+        params, shared = store.params_table(jobs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    shared.pop('view', None)
+
+    if os.path.exists(os.path.join(path, store.META_FILE)):
+        result_store = store.ResultStore(path, mode='r+')
+        if not np.array_equal(result_store.params, params) or result_store.meta['config'] != shared:
+            print(f"Error: the result store at {path} was created for different parameters")
+            return
+        print(f"Resuming {path} at row {result_store.completed} of {len(result_store)}")
+    else:
+        result_store = store.ResultStore.create(path, params, config=shared, dtype=dtype)
+
+    remaining = len(result_store) - result_store.completed
+    if remaining == 0:
+        print(f"The result store at {path} is already complete ({len(result_store)} rows)")
+        return
+    elapsed = result_store.fill(batch_size=batch_size)
+    print(f"Stored {len(result_store)} rows in {path} ({remaining} calculated in {elapsed:.2f} s, {remaining / elapsed:.0f} rows/s)")
+
+def has_display():
+    """
+    Returns False when the process cannot open a window (e.g. an X11/Wayland
+    session without DISPLAY/WAYLAND_DISPLAY, or MPLBACKEND set to Agg).
+    """
+    if os.environ.get('MPLBACKEND', '').lower() == 'agg':
+        return False
+    if sys.platform.startswith('win') or sys.platform == 'darwin':
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def draw(ax, config):
+    """
+    Draws the view selected by config['view'] on ax. The remaining keys are drawing parameters.
+    A 'layers' list (from a JSON file) draws that layer stack at config['bias'] instead
+    (only in the 'after' view).
+    """
+    from . import plotter, sweep
+    sweep.check_config(config)
+    config = dict(config)
     view_type = config.pop('view', 'after')
-    output_file = config.pop('output', None)
-    
-    if view_type == 'before':
+    config.pop('output', None)
+    stack = config.pop('layers', None)
+    if stack:
+        plotter.draw_stack(ax, stack, **config)
+    elif view_type == 'before':
         plotter.draw_pre_junction_diagram(ax, **config)
     else:
         plotter.draw_band_diagram(ax, **config)
-    
-    if output_file:
-        fig.tight_layout(rect=[0, 0, 0.85, 1])
-        plt.savefig(output_file, bbox_inches='tight')
-        print(f"Band diagram saved to {output_file}")
-    else:
+
+def draw_or_report(ax, config):
+    """
+    Calls draw() and prints invalid parameters or a failed Poisson solution
+    as an error instead of a traceback. Returns True if the diagram was drawn.
+    """
+    try:
+        draw(ax, config)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        return False
+    return True
+
+MODES = {
+    'sweep': sweep_main,
+    'animate': animate_main,
+    'summary': summary_main,
+    'design': design_main,
+    'materials': materials_main,
+    'iv': iv_main,
+    'serve': serve_main,
+}
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in MODES:
+        return MODES[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(description="Band Diagram Plotter (CUI)", conflict_handler='resolve',
+                                     epilog=f"Other modes: {', '.join(MODES)} (run e.g. 'run_cli.py sweep --help')")
+    add_parameter_arguments(parser)
+    parser.add_argument('--output', dest='output', type=str, help='Output filename (e.g., band_diagram.png)')
+    parser.add_argument('--cache-dir', dest='cache_dir', type=str, help='Directory for caching rendered images between runs')
+    parser.add_argument('--profile', dest='profile', type=str, help='Write a per-stage timing report (JSON, also loadable as a Chrome/Perfetto trace) to this file')
+    parser.add_argument('--profile-memory', dest='profile_memory', action='store_true', help='Also record allocation peaks with --profile (slows down the run, especially imports)')
+
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profiling.enable(memory=args.profile_memory)
+    try:
+        with profiling.span('cli.main'):
+            render(args)
+    finally:
+        if args.profile:
+            profiling.disable()
+            profiling.save(args.profile)
+            print(profiling.format_report())
+            print(f"Profile saved to {args.profile}")
+
+def render(args):
+    """
+    Draws the diagram configured by the parsed arguments of main() and shows or saves it.
+    """
+    config = load_config(args)
+    if config is None:
+        return
+
+    output_file = config.pop('output', None)
+    if not output_file and not has_display():
+        output_file = HEADLESS_OUTPUT
+        print(f"No display available, saving to {output_file} instead")
+
+    if not output_file:
+        # Interactive window: only this path needs pyplot and a GUI backend
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(10, 7))
+        if not draw_or_report(ax, config):
+            return
         fig.tight_layout(rect=[0, 0, 0.85, 1])
         plt.show()
+        return
+
+    image_cache = None
+    fmt = os.path.splitext(output_file)[1][1:].lower() or 'png'
+    if args.cache_dir:
+        from . import cache
+        image_cache = cache.ImageCache(args.cache_dir)
+        with profiling.span('cli.image_cache'):
+            data = image_cache.get(config, fmt)
+        if data is not None:
+            with open(output_file, 'wb') as f:
+                f.write(data)
+            print(f"Band diagram saved to {output_file} (cached)")
+            return
+
+    # File output: an Agg figure without pyplot's backend and event machinery
+    with profiling.span('cli.import'):
+        from . import plotter
+    fig = plotter.new_figure(figsize=(10, 7))
+    ax = fig.add_subplot()
+    if not draw_or_report(ax, config):
+        return
+    with profiling.span('cli.tight_layout'):
+        fig.tight_layout(rect=[0, 0, 0.85, 1])
+    with profiling.span('cli.savefig'):
+        if image_cache is not None:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, bbox_inches='tight')
+            image_cache.put(config, fmt, buffer.getvalue())
+            with open(output_file, 'wb') as f:
+                f.write(buffer.getvalue())
+        else:
+            fig.savefig(output_file, bbox_inches='tight')
+    print(f"Band diagram saved to {output_file}")
 
 if __name__ == "__main__":
     main()
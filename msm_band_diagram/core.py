@@ -1,5 +1,39 @@
 import numpy as np
 
+from . import profiling
+from .result import BandStructure, PreJunctionBands
+
+def _shared_grid(start, stop, num):
+    # Grids are shared by every result, so they are made read-only
+    grid = np.linspace(start, stop, num)
+    grid.setflags(write=False)
+    return grid
+
+# --- X-axis definition (after junction) ---
+SEMICONDUCTOR_WIDTH = 20.0
+X_METAL_LEFT = _shared_grid(-10, 0, 100)
+X_SEMICONDUCTOR = _shared_grid(0, SEMICONDUCTOR_WIDTH, 500)
+X_METAL_RIGHT = _shared_grid(SEMICONDUCTOR_WIDTH, SEMICONDUCTOR_WIDTH + 10, 100)
+
+# --- X-axis definition (before junction) ---
+# Match widths of the 'after' view for consistency, center the semiconductor
+# around x=0 and place the metals on either side with a visual gap
+_PRE_METAL_WIDTH = 10.0
+_PRE_GAP = 2.0
+PRE_X_SEMICONDUCTOR = _shared_grid(-SEMICONDUCTOR_WIDTH / 2, SEMICONDUCTOR_WIDTH / 2, 100)
+PRE_X_METAL_LEFT = _shared_grid(-SEMICONDUCTOR_WIDTH / 2 - _PRE_GAP - _PRE_METAL_WIDTH, -SEMICONDUCTOR_WIDTH / 2 - _PRE_GAP, 100)
+PRE_X_METAL_RIGHT = _shared_grid(SEMICONDUCTOR_WIDTH / 2 + _PRE_GAP, SEMICONDUCTOR_WIDTH / 2 + _PRE_GAP + _PRE_METAL_WIDTH, 100)
+
+def get_grids(mesh=None):
+    """
+    Returns the (x_metal_left, x_semiconductor, x_metal_right) grids of a
+    mesh.Mesh, or the default uniform grids if mesh is None.
+    """
+    if mesh is None:
+        return X_METAL_LEFT, X_SEMICONDUCTOR, X_METAL_RIGHT
+    return mesh.x_metal_left, mesh.x_semiconductor, mesh.x_metal_right
+
+@profiling.profiled('core.calculate_band_structure')
 def calculate_band_structure(chi, eg, fermi_shift, wf_left, wf_right, bias, **kwargs):
     """
     Calculates the energy band structure for an MSM device.
@@ -13,20 +47,27 @@ def calculate_band_structure(chi, eg, fermi_shift, wf_left, wf_right, bias, **kw
         wf_left (float): Work function of the left electrode in eV.
         wf_right (float): Work function of the right electrode in eV.
         bias (float): Applied bias voltage in V.
-        **kwargs: Catches unused parameters like labels.
+        **kwargs: Catches unused parameters like labels. model='poisson'
+                  selects the self-consistent Poisson solver (see
+                  poisson.calculate_band_structure for its parameters).
+                  mesh (mesh.Mesh) replaces the default uniform x-grids.
+                  dtype (e.g. 'float32') selects the dtype of the energies.
 
     Returns:
-        dict: A dictionary containing the calculated band structure data arrays.
+        result.BandStructure: The band structure, with dict-style access to
+                              its arrays. The x-grids are shared, read-only arrays.
     """
+    if kwargs.get('model', 'simple') == 'poisson':
+        from . import poisson
+        return poisson.calculate_band_structure(chi, eg, fermi_shift, wf_left, wf_right, bias, **kwargs)
+
     # --- Constants and References ---
     E_f_left = 0  # Left electrode Fermi level is the reference
     E_f_right = E_f_left - bias # Apply bias to the right electrode
 
-    # --- X-axis definition ---
-    semiconductor_width = 20.0
-    x_metal_left = np.linspace(-10, 0, 100)
-    x_semiconductor = np.linspace(0, semiconductor_width, 500)
-    x_metal_right = np.linspace(semiconductor_width, semiconductor_width + 10, 100)
+    # --- X-axis definition (shared, read-only grids) ---
+    semiconductor_width = SEMICONDUCTOR_WIDTH
+    x_metal_left, x_semiconductor, x_metal_right = get_grids(kwargs.get('mesh'))
 
     # --- Metal Region Calculations ---
     E_vac_left = E_f_left + wf_left
@@ -57,69 +98,260 @@ def calculate_band_structure(chi, eg, fermi_shift, wf_left, wf_right, bias, **kw
     # Quasi-Fermi levels in semiconductor (linear approximation)
     E_f_quasi = E_f_left + (E_f_right - E_f_left) * (x_semiconductor / semiconductor_width)
 
-    return {
-        "x_metal_left": x_metal_left,
-        "x_semiconductor": x_semiconductor,
-        "x_metal_right": x_metal_right,
-        "E_f_left": E_f_left,
-        "E_f_right": E_f_right,
-        "E_f_quasi": E_f_quasi,
-        "E_vac_left": E_vac_left,
-        "E_vac_right": E_vac_right,
-        "E_vac_final": E_vac_final,
-        "E_c": E_c,
-        "E_v": E_v,
-        "E_i": E_i,
-    }
+    return BandStructure(
+        dtype=kwargs.get('dtype'),
+        x_metal_left=x_metal_left,
+        x_semiconductor=x_semiconductor,
+        x_metal_right=x_metal_right,
+        E_f_left=E_f_left,
+        E_f_right=E_f_right,
+        E_f_quasi=E_f_quasi,
+        E_vac_left=E_vac_left,
+        E_vac_right=E_vac_right,
+        E_vac_final=E_vac_final,
+        E_c=E_c,
+        E_v=E_v,
+        E_i=E_i,
+    )
 
+@profiling.profiled('core.calculate_pre_junction_bands')
 def calculate_pre_junction_bands(chi, eg, fermi_shift, wf_left, wf_right, **kwargs):
     """
     Calculates the energy band structure for materials before junction.
     All levels are relative to the vacuum level (E_vac = 0).
     Doping type is determined by the sign of fermi_shift.
-    """
-    # --- X-axis definition for separated materials ---
-    # Match widths of the 'after' view for consistency
-    metal_width = 10.0
-    semiconductor_width = 20.0
-    gap = 2.0 # Visual separation
-
-    # Center the semiconductor around x=0
-    semi_start = -semiconductor_width / 2
-    semi_end = semiconductor_width / 2
-    x_semiconductor = np.linspace(semi_start, semi_end, 100)
+    All levels are flat, so they are stored as scalars (expanded over their
+    grid on dict-style access), and when a mesh is passed in kwargs each
+    segment is reduced to its two endpoints. dtype in kwargs selects the
+    dtype of the levels.
 
-    # Place metals on either side with a gap
-    x_metal_left = np.linspace(semi_start - gap - metal_width, semi_start - gap, 100)
-    x_metal_right = np.linspace(semi_end + gap, semi_end + gap + metal_width, 100)
+    Returns:
+        result.PreJunctionBands: The levels and the shared, read-only x-grids.
+    """
+    # --- X-axis definition for separated materials (shared, read-only grids) ---
+    x_semiconductor = PRE_X_SEMICONDUCTOR
+    x_metal_left = PRE_X_METAL_LEFT
+    x_metal_right = PRE_X_METAL_RIGHT
+    if kwargs.get('mesh') is not None:
+        x_semiconductor, x_metal_left, x_metal_right = (x[[0, -1]] for x in (x_semiconductor, x_metal_left, x_metal_right))
 
     # --- Left Metal ---
-    E_vac_left = np.full_like(x_metal_left, 0)
+    E_vac_left = 0.0
     E_f_left = E_vac_left - wf_left
 
     # --- Right Metal ---
-    E_vac_right = np.full_like(x_metal_right, 0)
+    E_vac_right = 0.0
     E_f_right = E_vac_right - wf_right
 
     # --- Semiconductor (flat bands) ---
-    E_vac_semi = np.full_like(x_semiconductor, 0)
+    E_vac_semi = 0.0
     E_c = E_vac_semi - chi
     E_v = E_c - eg
     E_i = E_c - eg / 2
     # E_f relative to E_i, matching the convention (positive shift is n-type, higher energy)
     E_f_semi = E_i + fermi_shift
 
+    return PreJunctionBands(
+        dtype=kwargs.get('dtype'),
+        x_metal_left=x_metal_left,
+        E_vac_left=E_vac_left,
+        E_f_left=E_f_left,
+        x_semiconductor=x_semiconductor,
+        E_vac_semi=E_vac_semi,
+        E_c=E_c,
+        E_v=E_v,
+        E_i=E_i,
+        E_f_semi=E_f_semi,
+        x_metal_right=x_metal_right,
+        E_vac_right=E_vac_right,
+        E_f_right=E_f_right,
+    )
+
+BATCH_PARAMETERS = ("chi", "eg", "fermi_shift", "wf_left", "wf_right", "bias")
+
+def _broadcast_parameters(params, kwargs, kind):
+    # BATCH_PARAMETERS from params (structured array or dict) and kwargs (which
+    # take precedence), as float arrays broadcast against each other
+    values = {}
+    if params is not None:
+        names = params.dtype.names if isinstance(params, np.ndarray) else params.keys()
+        for name in names:
+            if name in BATCH_PARAMETERS:
+                values[name] = params[name]
+    for name in BATCH_PARAMETERS:
+        if name in kwargs:
+            values[name] = kwargs[name]
+    missing = [name for name in BATCH_PARAMETERS if name not in values]
+    if missing:
+        raise TypeError(f"Missing {kind} parameters: {', '.join(missing)}")
+    return np.broadcast_arrays(*(np.asarray(values[name], dtype=float) for name in BATCH_PARAMETERS))
+
+@profiling.profiled('core.calculate_band_structure_batch')
+def calculate_band_structure_batch(params=None, **kwargs):
+    """
+    Calculates the energy band structure for many parameter sets at once.
+    Parameters are broadcast against each other and flattened to N rows,
+    so the result matches calling calculate_band_structure once per row.
+
+    Args:
+        params (numpy structured array or dict, optional): Parameter sets with
+                           fields named as in calculate_band_structure.
+        **kwargs: Array-like values for chi, eg, fermi_shift, wf_left,
+                  wf_right and bias. They override fields of params.
+                  dtype (e.g. 'float32') selects the dtype of the profiles
+                  and levels. Other keys (e.g. labels) are ignored. Only
+                  the default 'simple' model is supported.
+
+    Returns:
+        dict: The same keys as calculate_band_structure. Position arrays are
+              shared 1D grids, scalar levels become arrays of shape (N,) and
+              semiconductor profiles are stacked into arrays of shape
+              (N, n_points).
+    """
+    if kwargs.get('model', 'simple') != 'simple':
+        raise ValueError("calculate_band_structure_batch only supports the 'simple' model")
+
+    arrays = _broadcast_parameters(params, kwargs, 'batch')
+    chi, eg, fermi_shift, wf_left, wf_right, bias = (a.reshape(-1, 1) for a in arrays)
+
+    # --- Constants and References ---
+    E_f_left = 0
+    E_f_right = E_f_left - bias
+
+    # --- X-axis definition (shared by all rows) ---
+    semiconductor_width = SEMICONDUCTOR_WIDTH
+    x_metal_left, x_semiconductor, x_metal_right = get_grids(kwargs.get('mesh'))
+
+    # --- Metal Region Calculations ---
+    E_vac_left = E_f_left + wf_left
+    E_vac_right = E_f_right + wf_right
+
+    # --- Semiconductor Calculations ---
+    # Same expressions and evaluation order as calculate_band_structure,
+    # broadcast as (N, 1) parameters against the (n_points,) grid.
+    W_s = (chi + eg / 2) - fermi_shift
+    E_vac_bulk_equil = E_f_left + W_s
+
+    Ld = 2.0
+    decay_left = np.exp(-x_semiconductor / Ld)
+    decay_right = np.exp((x_semiconductor - semiconductor_width) / Ld)
+    bending = (E_vac_left - E_vac_bulk_equil) * decay_left + \
+              (E_vac_right - (E_vac_bulk_equil - bias)) * decay_right
+
+    x_fraction = x_semiconductor / semiconductor_width
+    potential_drop = -bias * x_fraction
+
+    E_vac_final = E_vac_bulk_equil + bending + potential_drop
+
+    E_c = E_vac_final - chi
+    E_v = E_c - eg
+    E_i = E_c - eg / 2
+
+    E_f_quasi = E_f_left + (E_f_right - E_f_left) * x_fraction
+
+    dtype = np.dtype(kwargs.get('dtype') or float)
     return {
         "x_metal_left": x_metal_left,
-        "E_vac_left": E_vac_left,
-        "E_f_left": E_f_left,
         "x_semiconductor": x_semiconductor,
-        "E_vac_semi": E_vac_semi,
-        "E_c": E_c,
-        "E_v": E_v,
-        "E_i": E_i,
-        "E_f_semi": E_f_semi,
         "x_metal_right": x_metal_right,
-        "E_vac_right": E_vac_right,
-        "E_f_right": E_f_right,
-    }
\ No newline at end of file
+        "E_f_left": np.full(E_f_right.shape[0], E_f_left, dtype=dtype),
+        "E_f_right": E_f_right[:, 0].astype(dtype, copy=False),
+        "E_f_quasi": E_f_quasi.astype(dtype, copy=False),
+        "E_vac_left": E_vac_left[:, 0].astype(dtype, copy=False),
+        "E_vac_right": E_vac_right[:, 0].astype(dtype, copy=False),
+        "E_vac_final": E_vac_final.astype(dtype, copy=False),
+        "E_c": E_c.astype(dtype, copy=False),
+        "E_v": E_v.astype(dtype, copy=False),
+        "E_i": E_i.astype(dtype, copy=False),
+    }
+
+# Columns of calculate_summary, in output order
+SUMMARY_FIELDS = (
+    "phi_bn_left", "phi_bp_left", "phi_bn_right", "phi_bp_right",
+    "barrier_left", "barrier_right", "W_s", "V_bi_left", "V_bi_right",
+    "E_c_left", "E_v_left", "E_c_right", "E_v_right", "ohmic_left", "ohmic_right",
+)
+
+@profiling.profiled('core.calculate_summary')
+def calculate_summary(params=None, **kwargs):
+    """
+    Calculates figures of merit in closed form, without building band
+    profiles. Parameters are broadcast against each other like in
+    calculate_band_structure_batch, so millions of configurations can be
+    evaluated in one call.
+
+    Args:
+        params (numpy structured array or dict, optional): Parameter sets with
+                           fields named as in calculate_band_structure.
+        **kwargs: Array-like values for chi, eg, fermi_shift, wf_left,
+                  wf_right and bias. They override fields of params.
+
+    Returns:
+        dict: Arrays of the broadcast shape with the keys of SUMMARY_FIELDS:
+              phi_bn_*/phi_bp_*: Schottky-Mott electron and hole barrier
+                  heights at each contact (wf - chi, chi + eg - wf) in eV.
+              barrier_*: The majority-carrier barrier (phi_bn for n-type,
+                  phi_bp for p-type).
+              W_s: Semiconductor work function in eV.
+              V_bi_*: Built-in potential at each contact, wf - W_s in eV
+                  (the band bending at equilibrium, positive when the bands
+                  bend upwards towards the metal).
+              E_c_*/E_v_*: Band edges at the interfaces (x = 0 and
+                  x = SEMICONDUCTOR_WIDTH) under bias, equal to the ends of
+                  the profiles of calculate_band_structure ('simple' model).
+              ohmic_*: True for an ohmic (accumulation) contact, False for
+                  a rectifying (depletion) contact.
+    """
+    chi, eg, fermi_shift, wf_left, wf_right, bias = _broadcast_parameters(params, kwargs, 'summary')
+
+    # --- Barrier heights (Schottky-Mott rule) ---
+    n_type = fermi_shift >= 0
+    phi_bn_left = wf_left - chi
+    phi_bp_left = chi + eg - wf_left
+    phi_bn_right = wf_right - chi
+    phi_bp_right = chi + eg - wf_right
+
+    # --- Built-in potentials ---
+    W_s = (chi + eg / 2) - fermi_shift
+    V_bi_left = wf_left - W_s
+    V_bi_right = wf_right - W_s
+
+    # --- Interface band edges ---
+    # The profile of calculate_band_structure at x = 0 and x = SEMICONDUCTOR_WIDTH,
+    # with the same expressions and evaluation order
+    E_f_left = 0
+    E_f_right = E_f_left - bias
+    E_vac_left = E_f_left + wf_left
+    E_vac_right = E_f_right + wf_right
+    E_vac_bulk_equil = E_f_left + W_s
+    Ld = 2.0
+    decay_far = np.exp(-SEMICONDUCTOR_WIDTH / Ld)
+    step_left = E_vac_left - E_vac_bulk_equil
+    step_right = E_vac_right - (E_vac_bulk_equil - bias)
+    E_vac_at_left = E_vac_bulk_equil + (step_left + step_right * decay_far)
+    E_vac_at_right = E_vac_bulk_equil + (step_left * decay_far + step_right) - bias
+    E_c_left = E_vac_at_left - chi
+    E_c_right = E_vac_at_right - chi
+
+    # --- Contact type ---
+    # Rectifying when the metal depletes the majority carriers
+    ohmic_left = np.where(n_type, V_bi_left <= 0, V_bi_left >= 0)
+    ohmic_right = np.where(n_type, V_bi_right <= 0, V_bi_right >= 0)
+
+    return {
+        "phi_bn_left": phi_bn_left,
+        "phi_bp_left": phi_bp_left,
+        "phi_bn_right": phi_bn_right,
+        "phi_bp_right": phi_bp_right,
+        "barrier_left": np.where(n_type, phi_bn_left, phi_bp_left),
+        "barrier_right": np.where(n_type, phi_bn_right, phi_bp_right),
+        "W_s": W_s,
+        "V_bi_left": V_bi_left,
+        "V_bi_right": V_bi_right,
+        "E_c_left": E_c_left,
+        "E_v_left": E_c_left - eg,
+        "E_c_right": E_c_right,
+        "E_v_right": E_c_right - eg,
+        "ohmic_left": ohmic_left,
+        "ohmic_right": ohmic_right,
+    }
@@ -0,0 +1,110 @@
+import numpy as np
+
+from . import core
+
+CONTACT_TYPES = ('ohmic', 'rectifying')
+
+def _top_k(scores, indices, best_scores, best_indices, k):
+    # Merges the k lowest scores of a chunk into the running best k. Every
+    # score tied with the k-th one is kept before the stable sort, so ties
+    # keep the search order
+    if scores.size > k:
+        keep = scores <= np.partition(scores, k - 1)[k - 1]
+        scores, indices = scores[keep], indices[keep]
+    scores = np.concatenate([best_scores, scores])
+    indices = np.concatenate([best_indices, indices])
+    order = np.lexsort((indices, scores))[:k]
+    return scores[order], indices[order]
+
+def search(chi, eg, wf_left, wf_right, fermi_shift, bias=0.0, barrier_left=None, barrier_right=None,
+           contact_left=None, contact_right=None, metals=None, top_k=10, chunk_size=65536):
+    """
+    Searches electrode work functions and doping for target contact properties.
+
+    Every combination of the candidate wf_left, wf_right and fermi_shift
+    values is evaluated with core.calculate_summary in vectorized chunks.
+    Candidates whose contact types differ from the targets are rejected;
+    the others are ranked by the deviation of the majority-carrier barriers
+    from the targets (sum of both contacts, eV). The Schottky-Mott barriers
+    and contact types do not depend on the bias, so it is only used for the
+    returned drawing parameters.
+
+    Args:
+        chi (float): Electron affinity of the semiconductor in eV.
+        eg (float): Band gap of the semiconductor in eV.
+        wf_left, wf_right (array-like): Candidate work functions in eV.
+                           Ignored when metals is given.
+        fermi_shift (array-like): Candidate Fermi level shifts in eV (the doping).
+        bias (float): Bias of the returned params in V.
+        barrier_left, barrier_right (float, optional): Target majority-carrier
+                           barrier heights in eV.
+        contact_left, contact_right (str, optional): Required contact type,
+                           'ohmic' or 'rectifying'.
+        metals (dict, optional): Candidate electrode metals {label: work function}.
+                           Both electrodes are chosen from them.
+        top_k (int): Number of candidates to return.
+        chunk_size (int): Candidates evaluated per chunk.
+
+    Returns:
+        list: Up to top_k dicts sorted by score (ties in candidate order),
+              with 'rank', 'score', the summary values at bias, and
+              'params': the keyword arguments for plotter.draw_band_diagram.
+    """
+    for contact in (contact_left, contact_right):
+        if contact is not None and contact not in CONTACT_TYPES:
+            raise ValueError(f"Invalid contact type '{contact}', expected one of {', '.join(CONTACT_TYPES)}")
+
+    if metals is not None:
+        if not metals:
+            raise ValueError("No candidate metals given")
+        labels = np.array(list(metals), dtype=object)
+        wf_left = wf_right = np.array(list(metals.values()), dtype=float)
+    else:
+        labels = None
+        wf_left = np.atleast_1d(np.asarray(wf_left, dtype=float))
+        wf_right = np.atleast_1d(np.asarray(wf_right, dtype=float))
+    fermi_shift = np.atleast_1d(np.asarray(fermi_shift, dtype=float))
+    shape = (wf_left.size, wf_right.size, fermi_shift.size)
+    total = int(np.prod(shape))
+
+    best_scores = np.empty(0)
+    best_indices = np.empty(0, dtype=np.intp)
+    for start in range(0, total, chunk_size):
+        index = np.arange(start, min(start + chunk_size, total))
+        i_left, i_right, i_shift = np.unravel_index(index, shape)
+        summary = core.calculate_summary(chi=chi, eg=eg, fermi_shift=fermi_shift[i_shift],
+                                         wf_left=wf_left[i_left], wf_right=wf_right[i_right], bias=bias)
+        error = np.zeros(summary['W_s'].shape)
+        if barrier_left is not None:
+            error += np.abs(summary['barrier_left'] - barrier_left)
+        if barrier_right is not None:
+            error += np.abs(summary['barrier_right'] - barrier_right)
+        feasible = np.ones(error.shape, dtype=bool)
+        if contact_left is not None:
+            feasible &= summary['ohmic_left'] == (contact_left == 'ohmic')
+        if contact_right is not None:
+            feasible &= summary['ohmic_right'] == (contact_right == 'ohmic')
+        scores = np.where(feasible, error, np.inf)
+
+        candidates = np.flatnonzero(np.isfinite(scores))
+        best_scores, best_indices = _top_k(scores[candidates], index[candidates], best_scores, best_indices, top_k)
+
+    results = []
+    for rank, (score, flat_index) in enumerate(zip(best_scores, best_indices), start=1):
+        i_left, i_right, i_shift = np.unravel_index(flat_index, shape)
+        params = {
+            'chi': chi,
+            'eg': eg,
+            'fermi_shift': float(fermi_shift[i_shift]),
+            'wf_left': float(wf_left[i_left]),
+            'wf_right': float(wf_right[i_right]),
+            'bias': float(bias),
+        }
+        if labels is not None:
+            params['label_left'] = labels[i_left]
+            params['label_right'] = labels[i_right]
+        result = {'rank': rank, 'score': float(score)}
+        result.update((name, value.item()) for name, value in core.calculate_summary(**params).items())
+        result['params'] = params
+        results.append(result)
+    return results
@@ -1,14 +1,21 @@
+import time
 import tkinter as tk
+from collections import deque
 from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from . import plotter
+from . import materials, plotter, profiling
 
 class BandDiagramApp:
+    # Live redraws while a slider is dragged are coalesced to this frame rate
+    TARGET_FPS = 30
+
     def __init__(self, master):
         self.master = master
         master.title("MSM BandDiagram (GUI)")
         master.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self._sliders = []
+        self._syncing = False
 
         # --- Main Frame ---
         main_frame = ttk.Frame(master, padding="10")
@@ -30,18 +37,26 @@ class BandDiagramApp:
         semi_frame.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5, padx=5)
         ttk.Label(semi_frame, text="Electron Affinity (χ)").grid(row=0, column=0, sticky=tk.W, pady=2)
         self.electron_affinity = tk.StringVar(value="4.05")
-        ttk.Entry(semi_frame, textvariable=self.electron_affinity, width=10).grid(row=0, column=1, sticky=tk.W)
+        self._add_entry(semi_frame, 0, self.electron_affinity)
         ttk.Label(semi_frame, text="eV").grid(row=0, column=2, sticky=tk.W)
+        self._add_slider(semi_frame, 0, self.electron_affinity, 2.0, 6.0)
 
         ttk.Label(semi_frame, text="Band Gap (Eg)").grid(row=1, column=0, sticky=tk.W, pady=2)
         self.band_gap = tk.StringVar(value="1.12")
-        ttk.Entry(semi_frame, textvariable=self.band_gap, width=10).grid(row=1, column=1, sticky=tk.W)
+        self._add_entry(semi_frame, 1, self.band_gap)
         ttk.Label(semi_frame, text="eV").grid(row=1, column=2, sticky=tk.W)
+        self._add_slider(semi_frame, 1, self.band_gap, 0.1, 6.0)
 
         ttk.Label(semi_frame, text="Fermi Shift (from Ei)").grid(row=2, column=0, sticky=tk.W, pady=2)
         self.fermi_shift = tk.StringVar(value="0.2")
-        ttk.Entry(semi_frame, textvariable=self.fermi_shift, width=10).grid(row=2, column=1, sticky=tk.W)
+        self._add_entry(semi_frame, 2, self.fermi_shift)
         ttk.Label(semi_frame, text="eV (+n, -p)").grid(row=2, column=2, sticky=tk.W)
+        self._add_slider(semi_frame, 2, self.fermi_shift, -1.5, 1.5)
+
+        ttk.Label(semi_frame, text="Material").grid(row=3, column=0, sticky=tk.W, pady=2)
+        self.semiconductor = tk.StringVar(value="Si")
+        self._add_material_picker(semi_frame, 3, self.semiconductor, 'semiconductors',
+                                  {'chi': self.electron_affinity, 'eg': self.band_gap})
 
         # --- Electrode Parameters ---
         electrode_frame = ttk.LabelFrame(params_frame, text="Electrodes", padding="5")
@@ -49,32 +64,39 @@ class BandDiagramApp:
 
         ttk.Label(electrode_frame, text="Left Electrode Work Function").grid(row=0, column=0, sticky=tk.W, pady=2)
         self.left_wf = tk.StringVar(value="4.2")
-        ttk.Entry(electrode_frame, textvariable=self.left_wf, width=10).grid(row=0, column=1, sticky=tk.W)
+        self._add_entry(electrode_frame, 0, self.left_wf)
         ttk.Label(electrode_frame, text="eV").grid(row=0, column=2, sticky=tk.W)
+        self._add_slider(electrode_frame, 0, self.left_wf, 3.0, 6.0)
 
         ttk.Label(electrode_frame, text="Left Electrode Label").grid(row=1, column=0, sticky=tk.W, pady=2)
         self.left_label = tk.StringVar(value="Al")
-        ttk.Entry(electrode_frame, textvariable=self.left_label, width=10).grid(row=1, column=1, sticky=tk.W)
+        self._add_material_picker(electrode_frame, 1, self.left_label, 'metals', {'wf': self.left_wf})
 
         ttk.Label(electrode_frame, text="Right Electrode Work Function").grid(row=2, column=0, sticky=tk.W, pady=2)
         self.right_wf = tk.StringVar(value="5.1")
-        ttk.Entry(electrode_frame, textvariable=self.right_wf, width=10).grid(row=2, column=1, sticky=tk.W)
+        self._add_entry(electrode_frame, 2, self.right_wf)
         ttk.Label(electrode_frame, text="eV").grid(row=2, column=2, sticky=tk.W)
+        self._add_slider(electrode_frame, 2, self.right_wf, 3.0, 6.0)
 
         ttk.Label(electrode_frame, text="Right Electrode Label").grid(row=3, column=0, sticky=tk.W, pady=2)
         self.right_label = tk.StringVar(value="Au")
-        ttk.Entry(electrode_frame, textvariable=self.right_label, width=10).grid(row=3, column=1, sticky=tk.W)
+        self._add_material_picker(electrode_frame, 3, self.right_label, 'metals', {'wf': self.right_wf})
         
         ttk.Label(electrode_frame, text="Bias Voltage").grid(row=4, column=0, sticky=tk.W, pady=2)
         self.bias_voltage = tk.StringVar(value="0.0")
-        ttk.Entry(electrode_frame, textvariable=self.bias_voltage, width=10).grid(row=4, column=1, sticky=tk.W)
+        self._add_entry(electrode_frame, 4, self.bias_voltage)
         ttk.Label(electrode_frame, text="V").grid(row=4, column=2, sticky=tk.W)
+        self._add_slider(electrode_frame, 4, self.bias_voltage, -2.0, 2.0)
 
         # --- Action Buttons Frame ---
         buttons_frame = ttk.Frame(main_frame)
         buttons_frame.grid(row=1, column=0, pady=10)
         ttk.Button(buttons_frame, text="Plot", command=self.plot).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Save Plot", command=self.save_plot).pack(side=tk.LEFT, padx=5)
+        self.show_fps = tk.BooleanVar(value=False)
+        ttk.Checkbutton(buttons_frame, text="Show FPS", variable=self.show_fps, command=self._update_fps_label).pack(side=tk.LEFT, padx=5)
+        self.fps_label = ttk.Label(buttons_frame, text="", width=12)
+        self.fps_label.pack(side=tk.LEFT, padx=5)
 
         # --- Plot Frame ---
         plot_frame = ttk.LabelFrame(main_frame, text="Band Diagram", padding="10")
@@ -86,36 +108,156 @@ class BandDiagramApp:
         self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+        # --- Live redraw state ---
+        self.diagram = None
+        self._redraw_job = None
+        self._last_frame = 0.0
+        self._frame_times = deque(maxlen=30)
+
         self.plot() # Initial plot
 
+    def _add_entry(self, frame, row, variable):
+        entry = ttk.Entry(frame, textvariable=variable, width=10)
+        entry.grid(row=row, column=1, sticky=tk.W)
+        entry.bind("<Return>", lambda event: self.plot())
+
+    def _add_material_picker(self, frame, row, variable, category, targets):
+        """
+        Adds an editable drop-down of the library materials of a category.
+        Choosing one writes its properties into the target variables
+        ({property: variable}) and replots; typed text is kept as a label.
+        """
+        try:
+            values = materials.names(category)
+        except ValueError as e:
+            values = []
+            messagebox.showerror("Material Library Error", str(e))
+
+        def on_select(event):
+            entry = materials.lookup(variable.get(), category)
+            for prop, target in targets.items():
+                target.set(f"{entry[prop]:g}")
+            self.plot()
+
+        picker = ttk.Combobox(frame, textvariable=variable, values=values, width=8)
+        picker.grid(row=row, column=1, sticky=tk.W)
+        picker.bind("<<ComboboxSelected>>", on_select)
+
+    def _add_slider(self, frame, row, variable, from_, to):
+        """
+        Adds a slider next to an entry. Dragging it writes the value into the
+        entry's variable and requests a live redraw; releasing it replots.
+        """
+        def on_slide(value):
+            if self._syncing:
+                return
+            variable.set(f"{float(value):.2f}")
+            self.request_redraw()
+
+        scale = ttk.Scale(frame, from_=from_, to=to, orient=tk.HORIZONTAL, length=150, command=on_slide)
+        scale.grid(row=row, column=3, sticky=(tk.W, tk.E), padx=5)
+        scale.bind("<ButtonRelease-1>", lambda event: self.plot())
+        self._sliders.append((scale, variable))
+
+    def _sync_sliders(self):
+        # Move the sliders to the values typed into the entries
+        self._syncing = True
+        try:
+            for scale, variable in self._sliders:
+                try:
+                    scale.set(float(variable.get()))
+                except ValueError:
+                    pass
+        finally:
+            self._syncing = False
+
     def on_closing(self):
+        if self._redraw_job is not None:
+            self.master.after_cancel(self._redraw_job)
         self.master.quit()
         self.master.destroy()
 
-    def plot(self):
+    def request_redraw(self):
+        """
+        Schedules a live redraw. Requests arriving before the next frame is due
+        are coalesced into one redraw that uses the latest values.
+        """
+        if self._redraw_job is not None:
+            return
+        interval = 1.0 / self.TARGET_FPS
+        delay = max(0.0, self._last_frame + interval - time.perf_counter())
+        self._redraw_job = self.master.after(int(delay * 1000), self._live_redraw)
+
+    def _live_redraw(self):
+        self._redraw_job = None
+        self.plot(live=True)
+
+    def _record_frame(self):
+        self._last_frame = time.perf_counter()
+        self._frame_times.append(self._last_frame)
+        self._update_fps_label()
+
+    def frames_per_second(self):
+        """
+        Returns the frame rate achieved over the most recent redraws.
+        """
+        if len(self._frame_times) < 2 or time.perf_counter() - self._frame_times[-1] > 1.0:
+            return 0.0
+        return (len(self._frame_times) - 1) / (self._frame_times[-1] - self._frame_times[0])
+
+    def _update_fps_label(self):
+        text = f"{self.frames_per_second():.1f} FPS" if self.show_fps.get() else ""
+        self.fps_label.configure(text=text)
+
+    def get_params(self):
+        """
+        Reads the parameters from the input fields. Raises ValueError for invalid numbers.
+        """
+        return {
+            'chi': float(self.electron_affinity.get()),
+            'eg': float(self.band_gap.get()),
+            'fermi_shift': float(self.fermi_shift.get()),
+            'wf_left': float(self.left_wf.get()),
+            'wf_right': float(self.right_wf.get()),
+            'label_left': self.left_label.get(),
+            'label_right': self.right_label.get(),
+            'bias': float(self.bias_voltage.get())
+        }
+
+    @profiling.profiled('gui.plot')
+    def plot(self, live=False):
+        """
+        Redraws the diagram. A live redraw (while dragging a slider) only updates
+        the artists and blits; a full redraw also refits the limits and layout.
+        """
         try:
-            params = {
-                'chi': float(self.electron_affinity.get()),
-                'eg': float(self.band_gap.get()),
-                'fermi_shift': float(self.fermi_shift.get()),
-                'wf_left': float(self.left_wf.get()),
-                'wf_right': float(self.right_wf.get()),
-                'label_left': self.left_label.get(),
-                'label_right': self.right_label.get(),
-                'bias': float(self.bias_voltage.get())
-            }
+            params = self.get_params()
         except ValueError:
-            messagebox.showerror("Input Error", "Invalid numerical value entered.")
+            if not live:
+                messagebox.showerror("Input Error", "Invalid numerical value entered.")
             return
-        
+
         view_type = self.view_type.get()
-        if view_type == 'before':
-            plotter.draw_pre_junction_diagram(self.ax, **params)
-        else: # after
-            plotter.draw_band_diagram(self.ax, **params)
+        diagram_class = plotter.PreJunctionDiagram if view_type == 'before' else plotter.BandDiagram
+        if not isinstance(self.diagram, diagram_class):
+            if self.diagram is not None:
+                self.diagram.remove()
+            self.ax.clear()
+            self.diagram = diagram_class(self.ax, blit=True)
+            live = False
 
-        self.fig.tight_layout(rect=[0, 0, 0.85, 1])
-        self.canvas.draw()
+        self.diagram.hold_limits = live
+        self.diagram.update(**params)
+        if live:
+            with profiling.span('gui.blit'):
+                self.diagram.refresh()
+        else:
+            self._sync_sliders()
+            with profiling.span('gui.tight_layout'):
+                self.fig.tight_layout(rect=[0, 0, 0.85, 1])
+            with profiling.span('gui.draw'):
+                self.canvas.draw()
+        self._record_frame()
 
     def save_plot(self):
         file_path = filedialog.asksaveasfilename(
@@ -128,11 +270,19 @@ class BandDiagramApp:
             ])
         if not file_path:
             return
+        # Blitted artists are animated, which savefig would leave out
+        self.diagram.set_animated(False)
         try:
-            self.fig.savefig(file_path, bbox_inches='tight')
+            # Only the saving is timed, not the dialogs waiting for the user
+            with profiling.span('gui.save_plot'):
+                self.fig.savefig(file_path, bbox_inches='tight')
             messagebox.showinfo("Success", f"Plot saved to {file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save plot: {e}")
+        finally:
+            self.diagram.set_animated(True)
+            with profiling.span('gui.draw'):
+                self.canvas.draw()
 
 def main():
     root = tk.Tk()
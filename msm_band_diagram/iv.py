@@ -0,0 +1,139 @@
+import numpy as np
+
+from . import core, profiling
+from .poisson import EPS0, K_B, Q
+
+# Effective Richardson constant of free electrons (A cm^-2 K^-2)
+RICHARDSON = 120.0
+
+# Columns written by save_iv, in output order
+IV_FIELDS = ("bias", "J", "I", "V_left", "V_right", "barrier_left", "barrier_right")
+
+def image_force_lowering(psi, doping, eps_r):
+    """
+    Returns the Schottky barrier lowering (eV) by the image force at a
+    depleted contact with band bending psi (V), in the depletion approximation.
+
+    Args:
+        psi (array): Band bending across the depletion region in V (no lowering below 0).
+        doping (float): Dopant density in cm^-3.
+        eps_r (float): Relative permittivity of the semiconductor.
+    """
+    eps = EPS0 * eps_r
+    field = np.sqrt(2 * Q * doping * 1e6 * np.maximum(psi, 0) / eps) # Interface field (V/m)
+    return np.sqrt(Q * field / (4 * np.pi * eps))
+
+def _log_abs_expm1(u):
+    # ln|exp(u) - 1| without overflow for large u (-inf at u = 0)
+    with np.errstate(divide='ignore'):
+        return np.where(u > 0, u, 0.0) + np.log(-np.expm1(-np.abs(u)))
+
+@profiling.profiled('iv.calculate_iv')
+def calculate_iv(chi, eg, fermi_shift, wf_left, wf_right, bias, temperature=300.0, richardson=RICHARDSON,
+                 area=1e-4, image_force=False, doping=1e16, eps_r=11.7, tol=1e-9, max_iter=100, **kwargs):
+    """
+    Calculates the current-voltage characteristic of the MSM device as two
+    back-to-back Schottky contacts with thermionic emission.
+
+    The majority-carrier barriers are those of core.calculate_summary (the
+    interface band edges of core.calculate_band_structure), clipped at 0 for
+    ohmic contacts. Each contact has the saturation current density
+    Js = richardson * T^2 * exp(-barrier / kT). Equal current through both
+    contacts gives the closed form
+
+        J = Js_f * Js_r * (1 - exp(-qV/kT)) / (Js_f + Js_r * exp(-qV/kT))
+
+    where the f contact is forward biased for V > 0 (the right contact for
+    n-type, the left one for p-type). It is evaluated in log space, so all
+    bias points are computed at once without overflow. With image_force, the
+    barriers are lowered according to the band bending left at each contact,
+    which depends on how the bias divides between them. That division is
+    found by bisection over all bias points at once.
+
+    Args:
+        chi, eg, fermi_shift, wf_left, wf_right (float): As in core.calculate_band_structure.
+        bias (array-like): Bias values in V (on the right electrode).
+        temperature (float): Temperature in K.
+        richardson (float): Effective Richardson constant in A cm^-2 K^-2.
+        area (float): Contact area in cm^2, for the current I.
+        image_force (bool): Include image-force barrier lowering.
+        doping (float): Dopant density in cm^-3 (image-force lowering only).
+        eps_r (float): Relative permittivity (image-force lowering only).
+        tol (float): Tolerance of the voltage division in V (image_force only).
+        max_iter (int): Maximum number of bisection steps (image_force only).
+        **kwargs: Catches unused parameters like labels.
+
+    Returns:
+        dict: Arrays of the shape of bias: 'bias', the current density 'J'
+              (A/cm^2, positive when a positive bias drives conventional
+              current from the right electrode to the left one), the current
+              'I' (A), the part of the bias that drops across each contact
+              'V_left' and 'V_right' (V, they add up to the bias) and the
+              effective barriers 'barrier_left' and 'barrier_right' (eV).
+    """
+    bias = np.asarray(bias, dtype=float)
+    summary = core.calculate_summary(chi=chi, eg=eg, fermi_shift=fermi_shift, wf_left=wf_left,
+                                     wf_right=wf_right, bias=0.0)
+    n_type = fermi_shift >= 0
+    kT = K_B * temperature
+    v = bias / kT
+    log_prefactor = np.log(richardson * temperature ** 2)
+
+    barrier = {side: np.maximum(summary[f'barrier_{side}'], 0.0) for side in ('left', 'right')}
+    # Depleting band bending at zero bias (negative for accumulation at an ohmic contact)
+    bending = {side: summary[f'V_bi_{side}'] * (1 if n_type else -1) for side in ('left', 'right')}
+    forward, reverse = ('right', 'left') if n_type else ('left', 'right')
+
+    lowering = {'left': 0.0, 'right': 0.0}
+    if image_force:
+        # Bisection on the forward voltage x of the f contact (units of kT) over
+        # all bias points at once: the current through the f contact minus that
+        # through the r contact (forward biased by x - v) increases with x and
+        # changes sign between 0 and v
+        low, high = np.minimum(v, 0.0), np.maximum(v, 0.0)
+        direction = np.sign(v)
+        for _ in range(max_iter):
+            x = (low + high) / 2 # At zero bias x = 0 and the excess is undefined, which is harmless
+            lowering[forward] = image_force_lowering(bending[forward] - x * kT, doping, eps_r)
+            lowering[reverse] = image_force_lowering(bending[reverse] - (x - v) * kT, doping, eps_r)
+            with np.errstate(invalid='ignore'):
+                log_excess = ((lowering[forward] - barrier[forward]) / kT + _log_abs_expm1(x)) - \
+                             ((lowering[reverse] - barrier[reverse]) / kT + _log_abs_expm1(x - v))
+            too_high = direction * log_excess > 0
+            high = np.where(too_high, x, high)
+            low = np.where(too_high, low, x)
+            if np.max(high - low, initial=0.0) * kT < tol:
+                break
+        x = (low + high) / 2
+        lowering[forward] = image_force_lowering(bending[forward] - x * kT, doping, eps_r)
+        lowering[reverse] = image_force_lowering(bending[reverse] - (x - v) * kT, doping, eps_r)
+
+    # With the barriers fixed, equal currents give the division in closed form:
+    # exp(v_f) = (Js_f + Js_r) / (Js_f + Js_r * exp(-v))
+    log_js_f = log_prefactor - (barrier[forward] - lowering[forward]) / kT
+    log_js_r = log_prefactor - (barrier[reverse] - lowering[reverse]) / kT
+    v_f = np.logaddexp(log_js_f, log_js_r) - np.logaddexp(log_js_f, log_js_r - v)
+
+    J = np.sign(v) * np.exp(log_js_f + log_js_r + _log_abs_expm1(-v) - np.logaddexp(log_js_f, log_js_r - v))
+
+    # The f contact takes v_f and the r contact the rest of the bias
+    V = {forward: v_f * kT, reverse: bias - v_f * kT}
+    return {
+        "bias": bias,
+        "J": J,
+        "I": J * area,
+        "V_left": V['left'],
+        "V_right": V['right'],
+        "barrier_left": np.broadcast_to(barrier['left'] - lowering['left'], bias.shape),
+        "barrier_right": np.broadcast_to(barrier['right'] - lowering['right'], bias.shape),
+    }
+
+def save_iv(path, data):
+    """
+    Writes a calculate_iv result as CSV (.csv) or as NumPy arrays (.npz, one per IV_FIELDS column).
+    """
+    if path.lower().endswith('.npz'):
+        np.savez(path, **{name: np.asarray(data[name]) for name in IV_FIELDS})
+    else:
+        columns = np.column_stack([np.broadcast_to(data[name], data["bias"].shape) for name in IV_FIELDS])
+        np.savetxt(path, columns, delimiter=',', header=','.join(IV_FIELDS), comments='', fmt='%.10g')
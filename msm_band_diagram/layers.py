@@ -0,0 +1,229 @@
+import numpy as np
+
+from . import profiling
+
+KINDS = ('metal', 'semiconductor', 'insulator')
+
+# Rows of the energy buffer, in drawing order
+BANDS = ('E_vac', 'E_c', 'E_v', 'E_i', 'E_f')
+
+# Same screening length and point density as the default model in core
+# (500 points over the 20 units wide semiconductor)
+DEBYE_LENGTH = 2.0
+POINTS_PER_UNIT = 25.0
+
+class Layer:
+    """
+    One layer of a stack: a metal electrode (work function wf), a
+    semiconductor (chi, eg, fermi_shift) or an undoped insulator (chi, eg).
+    Thickness is in the x units of the band diagram.
+    """
+    __slots__ = ('kind', 'thickness', 'chi', 'eg', 'fermi_shift', 'wf', 'label', 'points')
+
+    def __init__(self, kind, thickness, chi=None, eg=None, fermi_shift=0.0, wf=None, label=None, points=None):
+        if kind not in KINDS:
+            raise ValueError(f"Invalid layer kind '{kind}', expected one of {', '.join(KINDS)}")
+        if not thickness > 0:
+            raise ValueError(f"Layer thickness must be positive, got {thickness}")
+        if kind == 'metal' and wf is None:
+            raise ValueError("A metal layer needs a work function (wf)")
+        if kind != 'metal' and (chi is None or eg is None):
+            raise ValueError(f"A {kind} layer needs an electron affinity (chi) and a band gap (eg)")
+        if points is not None and points < 2:
+            raise ValueError("A layer needs at least 2 points")
+        self.kind = kind
+        self.thickness = float(thickness)
+        self.chi = chi
+        self.eg = eg
+        self.fermi_shift = fermi_shift
+        self.wf = wf
+        self.label = label
+        self.points = points
+
+    def __repr__(self):
+        return f"Layer({self.kind!r}, {self.thickness:g}{', ' + repr(self.label) if self.label else ''})"
+
+# Material library category of each layer kind
+MATERIAL_CATEGORIES = {'metal': 'metals', 'semiconductor': 'semiconductors', 'insulator': 'insulators'}
+
+def _from_dict(item):
+    # A 'material' name supplies the parameters (and label) the dict does not give
+    item = dict(item)
+    unknown = [key for key in item if key != 'material' and key not in Layer.__slots__]
+    if unknown:
+        raise ValueError(f"Unknown layer key '{unknown[0]}', expected material or one of {', '.join(Layer.__slots__)}")
+    if 'kind' not in item or 'thickness' not in item:
+        raise ValueError("A layer needs a kind and a thickness")
+    name = item.pop('material', None)
+    if name is not None:
+        from . import materials
+        entry = materials.lookup(name, MATERIAL_CATEGORIES.get(item.get('kind')))
+        properties = ('wf',) if entry['category'] == 'metals' else ('chi', 'eg')
+        for prop in properties + ('label',):
+            item.setdefault(prop, entry[prop])
+    return Layer(**item)
+
+def as_layers(stack):
+    """
+    Returns the stack as a list of Layer, converting dicts (e.g. from a JSON
+    configuration) with Layer(**item). A dict may name a 'material' from the
+    material library instead of giving its parameters.
+    """
+    layers = [item if isinstance(item, Layer) else _from_dict(item) for item in stack]
+    if len(layers) < 3 or layers[0].kind != 'metal' or layers[-1].kind != 'metal':
+        raise ValueError("A stack needs a metal electrode at both ends and at least one layer in between")
+    if any(layer.kind == 'metal' for layer in layers[1:-1]):
+        raise ValueError("Metal layers are only supported as the electrodes at both ends of a stack")
+    return layers
+
+def _layer_points(layer, points_per_unit):
+    # Metal levels and the insulator vacuum level are linear, so two points are exact
+    if layer.points is not None:
+        return int(layer.points)
+    if layer.kind != 'semiconductor':
+        return 2
+    return max(2, int(round(layer.thickness * points_per_unit)))
+
+@profiling.profiled('layers.calculate_stack')
+def calculate_stack(stack, bias=0.0, points_per_unit=POINTS_PER_UNIT):
+    """
+    Calculates the band diagram of a metal / layers / metal stack.
+
+    The model generalizes core.calculate_band_structure: the bias drops
+    linearly across the layers between the electrodes, each semiconductor
+    relaxes exponentially (Debye length DEBYE_LENGTH) from its interface
+    vacuum levels to its bulk level, and insulators carry no charge, so
+    their vacuum level is linear. At an electrode the interface vacuum level
+    is that of the metal, between two semiconductors it is the mean of both
+    bulk levels, and next to an insulator it is the bulk level of the
+    semiconductor. For a single semiconductor this is the default model of core.
+
+    Every layer is evaluated at once on a single preallocated buffer, so the
+    cost grows linearly with the number of points and layers.
+
+    Args:
+        stack (list): Layer objects or dicts of Layer arguments, starting and
+                      ending with a metal electrode.
+        bias (float): Applied bias voltage in V (on the right electrode).
+        points_per_unit (float): Point density of semiconductor layers
+                                 without an explicit point count.
+
+    Returns:
+        dict: 'x' and the BANDS profiles ('E_c', 'E_v' and 'E_i' are NaN in
+              the metals), all views of 'buffer' (shape (len(BANDS), n, 2),
+              x and energy pairs per band); 'slices' (the points of each
+              layer), 'bounds' (the layer boundaries, shape (n_layers + 1,)),
+              'interfaces' (the vacuum level at each boundary) and 'layers'.
+    """
+    layers = as_layers(stack)
+    n_layers = len(layers)
+    kind = np.array([layer.kind for layer in layers])
+    metal = kind == 'metal'
+    semiconductor = kind == 'semiconductor'
+    thickness = np.array([layer.thickness for layer in layers])
+    chi = np.array([np.nan if layer.chi is None else layer.chi for layer in layers], dtype=float)
+    eg = np.array([np.nan if layer.eg is None else layer.eg for layer in layers], dtype=float)
+    fermi_shift = np.array([layer.fermi_shift or 0.0 for layer in layers], dtype=float)
+    wf = np.array([np.nan if layer.wf is None else layer.wf for layer in layers], dtype=float)
+
+    # --- Geometry: the left electrode ends at x=0, as in core ---
+    bounds = np.concatenate([[0.0], np.cumsum(thickness)]) - thickness[0]
+    width = bounds[-2] # Extent of the layers between the electrodes
+    points = np.array([_layer_points(layer, points_per_unit) for layer in layers])
+    offsets = np.concatenate([[0], np.cumsum(points)])
+    slices = [slice(offsets[i], offsets[i + 1]) for i in range(n_layers)]
+
+    # --- Fermi level: 0 at the left electrode, -bias at the right one ---
+    E_f_left = 0.0
+    E_f_right = E_f_left - bias
+    def fermi_level(x):
+        return E_f_left + (E_f_right - E_f_left) * np.clip(x, 0, width) / width
+
+    # --- Interface vacuum levels ---
+    W_s = (chi + eg / 2) - fermi_shift # Semiconductor work functions (NaN for other layers)
+    vac_metal = wf + np.where(np.arange(n_layers) == 0, E_f_left, E_f_right)
+    x_interface = bounds[1:-1]
+    target_left = W_s[:-1] + fermi_level(x_interface) # Bulk level of the layer left of each interface
+    target_right = W_s[1:] + fermi_level(x_interface)
+    interfaces = np.full(n_layers - 1, np.nan)
+    left_kind, right_kind = kind[:-1], kind[1:]
+    both = (left_kind == 'semiconductor') & (right_kind == 'semiconductor')
+    interfaces[both] = (target_left[both] + target_right[both]) / 2
+    only_left = (left_kind == 'semiconductor') & (right_kind == 'insulator')
+    interfaces[only_left] = target_left[only_left]
+    only_right = (left_kind == 'insulator') & (right_kind == 'semiconductor')
+    interfaces[only_right] = target_right[only_right]
+    interfaces[0] = vac_metal[0]
+    interfaces[-1] = vac_metal[-1]
+    # Between insulators the vacuum level stays linear
+    unknown = np.isnan(interfaces)
+    interfaces[unknown] = np.interp(x_interface[unknown], x_interface[~unknown], interfaces[~unknown])
+    vac_start = np.concatenate([[np.nan], interfaces]) # Vacuum level at the left edge of each layer
+    vac_end = np.concatenate([interfaces, [np.nan]])
+
+    # --- Per-layer coefficients of the vacuum level ---
+    # E_vac = offset + fermi * E_f(x) + slope * t + amp_left * exp(-(x - a) / Ld) + amp_right * exp((x - b) / Ld)
+    # with t the position within the layer from 0 to 1
+    offset = np.where(metal, wf, np.where(semiconductor, W_s, vac_start))
+    fermi = np.where(kind == 'insulator', 0.0, 1.0)
+    slope = np.where(kind == 'insulator', vac_end - vac_start, 0.0)
+    amp_left = np.where(semiconductor, vac_start - (W_s + fermi_level(bounds[:-1])), 0.0)
+    amp_right = np.where(semiconductor, vac_end - (W_s + fermi_level(bounds[1:])), 0.0)
+
+    # --- Evaluate every point at once, writing into the buffer ---
+    n_points = int(offsets[-1])
+    buffer = np.empty((len(BANDS), n_points, 2))
+    profiles = dict(zip(BANDS, (buffer[i, :, 1] for i in range(len(BANDS)))))
+    x = buffer[0, :, 0]
+    layer_index = np.repeat(np.arange(n_layers), points)
+    t = np.arange(n_points, dtype=float)
+    t -= offsets[:-1][layer_index]
+    t /= (points - 1)[layer_index]
+    np.multiply(t, thickness[layer_index], out=x)
+    x += bounds[:-1][layer_index]
+    buffer[1:, :, 0] = x
+
+    E_f = profiles['E_f']
+    np.clip(x, 0, width, out=E_f)
+    E_f *= (E_f_right - E_f_left) / width
+    E_f += E_f_left
+    E_vac = profiles['E_vac']
+    np.multiply(fermi[layer_index], E_f, out=E_vac)
+    E_vac += offset[layer_index]
+    E_vac += slope[layer_index] * t
+    # The E_c row serves as scratch for the exponentials
+    decay = profiles['E_c']
+    np.subtract(bounds[:-1][layer_index], x, out=decay)
+    decay /= DEBYE_LENGTH
+    np.exp(decay, out=decay)
+    decay *= amp_left[layer_index]
+    E_vac += decay
+    np.subtract(x, bounds[1:][layer_index], out=decay)
+    decay /= DEBYE_LENGTH
+    np.exp(decay, out=decay)
+    decay *= amp_right[layer_index]
+    E_vac += decay
+
+    np.subtract(E_vac, chi[layer_index], out=profiles['E_c'])
+    np.subtract(profiles['E_c'], eg[layer_index], out=profiles['E_v'])
+    np.subtract(profiles['E_c'], eg[layer_index] / 2, out=profiles['E_i'])
+
+    result = {"x": x}
+    result.update(profiles)
+    result.update({
+        "buffer": buffer,
+        "slices": slices,
+        "bounds": bounds,
+        "interfaces": interfaces,
+        "layers": layers,
+    })
+    return result
+
+def band_segments(result, band):
+    """
+    Returns the (n, 2) point arrays of one band for every layer where it is
+    defined, as views of the result buffer (e.g. for a LineCollection).
+    """
+    rows = result["buffer"][BANDS.index(band)]
+    return [rows[s] for layer, s in zip(result["layers"], result["slices"])
+            if band in ('E_vac', 'E_f') or layer.kind != 'metal']
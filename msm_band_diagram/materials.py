@@ -0,0 +1,195 @@
+import json
+import os
+from array import array
+
+# Packaged library; files named by the environment variable (separated by
+# os.pathsep) and by add_overrides() are merged on top of it, in that order
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'materials.json')
+ENV_VAR = 'MSM_BAND_DIAGRAM_MATERIALS'
+
+# Numeric properties of each category (all required, in eV except eps_r)
+CATEGORIES = {
+    'metals': ('wf',),
+    'semiconductors': ('chi', 'eg', 'eps_r'),
+    'insulators': ('chi', 'eg', 'eps_r'),
+}
+
+# Configuration keys that name a material, and the parameters they supply
+CONFIG_KEYS = {
+    'left': ('metals', {'wf': 'wf_left'}, 'label_left'),
+    'right': ('metals', {'wf': 'wf_right'}, 'label_right'),
+    'semiconductor': ('semiconductors', {'chi': 'chi', 'eg': 'eg', 'eps_r': 'eps_r'}, None),
+}
+
+_overrides = []
+_library = None
+
+def add_overrides(paths):
+    """
+    Merges the material files at paths on top of the library (later files
+    win). Entries replace the properties they give for an existing name.
+    """
+    global _library
+    _overrides.extend(os.path.abspath(path) for path in paths)
+    _library = None
+
+def reset():
+    """
+    Forgets the override files of add_overrides() and the loaded library.
+    """
+    global _library
+    _overrides.clear()
+    _library = None
+
+def sources():
+    """
+    Returns the material files in the order they are merged.
+    """
+    env = [path for path in os.environ.get(ENV_VAR, '').split(os.pathsep) if path]
+    return [DATA_FILE] + [os.path.abspath(path) for path in env] + list(_overrides)
+
+def _parse(paths):
+    entries = {category: {} for category in CATEGORIES}
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Material file not found: {path}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Could not decode material file {path}: {e}")
+        if not isinstance(data, dict):
+            raise ValueError(f"Material file must contain an object of categories in {path}")
+        for category, items in data.items():
+            if category not in CATEGORIES:
+                raise ValueError(f"Unknown material category '{category}' in {path}, "
+                                 f"expected one of {', '.join(CATEGORIES)}")
+            if not isinstance(items, dict):
+                raise ValueError(f"Category '{category}' must be an object of materials in {path}")
+            for name, properties in items.items():
+                if not isinstance(properties, dict):
+                    raise ValueError(f"Material '{name}' ({category}) must be an object of properties in {path}")
+                for prop in CATEGORIES[category]:
+                    value = properties.get(prop, 0.0)
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        raise ValueError(f"Property '{prop}' of material '{name}' ({category}) must be a number in {path}")
+                entries[category].setdefault(name, {}).update(properties)
+
+    tables = {}
+    for category, items in entries.items():
+        names = list(items)
+        columns = {}
+        for prop in CATEGORIES[category]:
+            missing = [name for name in names if prop not in items[name]]
+            if missing:
+                raise ValueError(f"Material {missing[0]} ({category}) has no '{prop}'")
+            columns[prop] = [float(items[name][prop]) for name in names]
+        columns['name'] = [str(items[name].get('name', name)) for name in names]
+        tables[category] = {'names': names, 'columns': columns}
+    return tables
+
+def _build(tables):
+    # Columnar tables: names, a case-insensitive index and one array per property
+    library = {}
+    for category, props in CATEGORIES.items():
+        table = tables[category]
+        names = tuple(table['names'])
+        columns = {prop: array('d', table['columns'][prop]) for prop in props}
+        columns['name'] = tuple(table['columns']['name'])
+        library[category] = {
+            'names': names,
+            'index': {name.lower(): i for i, name in enumerate(names)},
+            'columns': columns,
+        }
+    return library
+
+def library():
+    """
+    Returns the merged material tables, loading them on first use.
+
+    The files are read once per process; add_overrides() and reset()
+    discard the loaded tables.
+    """
+    global _library
+    if _library is None:
+        _library = _build(_parse(sources()))
+    return _library
+
+def names(category):
+    """
+    Returns the material names of a category, in library order.
+    """
+    return list(_table(category)['names'])
+
+def _table(category):
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown material category '{category}', expected one of {', '.join(CATEGORIES)}")
+    return library()[category]
+
+def _entry(table, i):
+    entry = {prop: values[i] for prop, values in table['columns'].items()}
+    entry['label'] = table['names'][i]
+    return entry
+
+def lookup(name, category=None):
+    """
+    Returns the properties of a material (case-insensitive name) as a dict
+    with its numeric properties, 'name' (the full name) and 'label' (the
+    library name). Without a category, all categories are searched.
+    """
+    categories = [category] if category is not None else list(CATEGORIES)
+    for candidate in categories:
+        table = _table(candidate)
+        i = table['index'].get(name.lower())
+        if i is not None:
+            entry = _entry(table, i)
+            entry['category'] = candidate
+            return entry
+    where = f" among {category}" if category is not None else ""
+    raise ValueError(f"Unknown material '{name}'{where}")
+
+def search(category, **ranges):
+    """
+    Returns the materials of a category whose properties lie within the given
+    inclusive ranges, sorted by the first property given.
+
+    Args:
+        category (str): 'metals', 'semiconductors' or 'insulators'.
+        **ranges: property=(min, max); None leaves that end open.
+
+    Returns:
+        list: lookup() dicts of the matching materials.
+    """
+    table = _table(category)
+    columns = table['columns']
+    for prop in ranges:
+        if prop not in CATEGORIES[category]:
+            raise ValueError(f"Unknown property '{prop}' for {category}, "
+                             f"expected one of {', '.join(CATEGORIES[category])}")
+    matches = []
+    for i in range(len(table['names'])):
+        if all((low is None or columns[prop][i] >= low) and (high is None or columns[prop][i] <= high)
+               for prop, (low, high) in ranges.items()):
+            matches.append(_entry(table, i))
+    if ranges:
+        first = next(iter(ranges))
+        matches.sort(key=lambda entry: entry[first])
+    return matches
+
+def resolve(config):
+    """
+    Returns the parameters supplied by the material names of a configuration:
+    'left' and 'right' give wf_left/label_left and wf_right/label_right,
+    'semiconductor' gives chi, eg and eps_r. Keys that are missing or None are skipped.
+    """
+    params = {}
+    for key, (category, properties, label_key) in CONFIG_KEYS.items():
+        name = config.get(key)
+        if name is None:
+            continue
+        entry = lookup(str(name), category)
+        for prop, param in properties.items():
+            params[param] = entry[prop]
+        if label_key is not None:
+            params[label_key] = entry['label']
+    return params
@@ -0,0 +1,150 @@
+import hashlib
+import heapq
+
+import numpy as np
+
+from . import core
+
+# Profiles that decide where the adaptive mesh needs points
+MESH_PROFILES = ("E_vac_final", "E_f_quasi")
+
+class Mesh:
+    """
+    Spatial mesh for calculate_band_structure: the node positions of the
+    left metal, the semiconductor and the right metal. Nodes do not have to
+    be uniformly spaced. Arrays are read-only, and meshes compare and hash
+    by content so they can be part of cache keys.
+    """
+    __slots__ = ('x_metal_left', 'x_semiconductor', 'x_metal_right', '_key')
+
+    def __init__(self, x_metal_left, x_semiconductor, x_metal_right):
+        digest = hashlib.sha1()
+        for name, x in zip(self.__slots__, (x_metal_left, x_semiconductor, x_metal_right)):
+            x = np.array(x, dtype=float)
+            if x.ndim != 1 or x.size < 2 or np.any(np.diff(x) <= 0):
+                raise ValueError(f"{name} must be an increasing 1D array with at least 2 points")
+            x.setflags(write=False)
+            object.__setattr__(self, name, x)
+            digest.update(x.tobytes())
+            digest.update(b'|')
+        object.__setattr__(self, '_key', digest.hexdigest())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Mesh is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, Mesh) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return (f"Mesh({self.x_metal_left.size}+{self.x_semiconductor.size}+{self.x_metal_right.size} points, "
+                f"key={self._key[:12]})")
+
+    @property
+    def n_points(self):
+        return self.x_metal_left.size + self.x_semiconductor.size + self.x_metal_right.size
+
+def uniform_mesh(n_metal=100, n_semiconductor=500):
+    """
+    Returns a uniformly spaced mesh over the default geometry.
+    With the default counts this is the mesh core uses without a mesh argument.
+    """
+    width = core.SEMICONDUCTOR_WIDTH
+    return Mesh(np.linspace(-10, 0, n_metal),
+                np.linspace(0, width, n_semiconductor),
+                np.linspace(width, width + 10, n_metal))
+
+def _interval_error(x, profiles, i, j):
+    # Largest error of linear interpolation between nodes i and j, and where it occurs
+    if j - i < 2:
+        return 0.0, i
+    t = (x[i + 1:j] - x[i]) / (x[j] - x[i])
+    inner = profiles[:, i + 1:j]
+    linear = profiles[:, i:i + 1] + (profiles[:, j:j + 1] - profiles[:, i:i + 1]) * t
+    error = np.abs(inner - linear).max(axis=0)
+    k = int(np.argmax(error))
+    return float(error[k]), i + 1 + k
+
+def refine(x, profiles, tol=1e-3, max_points=None):
+    """
+    Selects a subset of the reference nodes x such that linear interpolation
+    between the selected nodes reproduces every profile within tol.
+
+    Intervals are split greedily at the point of largest error, so nodes
+    concentrate where the profiles curve. Refinement stops when the error is
+    below tol or when max_points nodes are selected, whichever comes first.
+
+    Args:
+        x (array): Reference node positions, shape (n,).
+        profiles (array): Profile values at x, shape (n,) or (m, n).
+        tol (float, optional): Maximum interpolation error (eV). None refines
+                               up to max_points.
+        max_points (int, optional): Point budget (at least 2).
+
+    Returns:
+        numpy.ndarray: Indices of the selected nodes, sorted.
+    """
+    if tol is None and max_points is None:
+        raise ValueError("Either tol or max_points must be given")
+    x = np.asarray(x, dtype=float)
+    profiles = np.atleast_2d(np.asarray(profiles, dtype=float))
+    n = x.size
+    budget = n if max_points is None else max(2, min(max_points, n))
+
+    selected = [0, n - 1]
+    error, k = _interval_error(x, profiles, 0, n - 1)
+    heap = [(-error, 0, n - 1, k)]
+    while heap and len(selected) < budget:
+        neg_error, i, j, k = heapq.heappop(heap)
+        if tol is not None and -neg_error <= tol:
+            break
+        if -neg_error == 0.0:
+            break
+        selected.append(k)
+        for a, b in ((i, k), (k, j)):
+            error, m = _interval_error(x, profiles, a, b)
+            heapq.heappush(heap, (-error, a, b, m))
+    return np.sort(np.array(selected))
+
+def _collapse(x):
+    # Constant segments only need their two endpoints
+    return np.array([x[0], x[-1]])
+
+def band_mesh(tol=1e-3, max_points=None, n_reference=4001, **params):
+    """
+    Builds an adaptive mesh for the given parameters. The band profiles are
+    first evaluated on a fine uniform reference mesh, then refine() keeps
+    only the nodes needed to reproduce them within tol. The metal levels are
+    constant, so each metal segment collapses to its two endpoints.
+
+    Parameters may be arrays (simple model only), in which case the mesh is
+    refined for all parameter sets at once and can be shared by them.
+
+    Args:
+        tol (float, optional): Maximum interpolation error (eV).
+        max_points (int, optional): Point budget for the semiconductor.
+        n_reference (int): Number of nodes of the reference mesh.
+        **params: Parameters of core.calculate_band_structure.
+
+    Returns:
+        Mesh: The adaptive mesh.
+    """
+    params = {k: v for k, v in params.items() if k != 'mesh'}
+    reference = uniform_mesh(n_semiconductor=n_reference)
+    if any(np.ndim(params.get(name, 0)) > 0 for name in core.BATCH_PARAMETERS):
+        data = core.calculate_band_structure_batch(mesh=reference, **params)
+    else:
+        data = core.calculate_band_structure(mesh=reference, **params)
+    profiles = np.vstack([np.atleast_2d(data[name]) for name in MESH_PROFILES])
+    x = reference.x_semiconductor
+    selected = refine(x, profiles, tol=tol, max_points=max_points)
+    return Mesh(_collapse(reference.x_metal_left), x[selected], _collapse(reference.x_metal_right))
+
+def max_interpolation_error(x, y, x_ref, y_ref):
+    """
+    Returns the largest difference between the piecewise-linear profile (x, y)
+    and a reference profile (x_ref, y_ref), evaluated at the reference nodes.
+    """
+    return float(np.max(np.abs(np.interp(x_ref, x, y) - y_ref)))
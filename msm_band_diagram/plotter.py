@@ -1,132 +1,536 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from . import core # Use relative import within the package
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from . import cache, layers, profiling # Use relative import within the package
 
+def new_figure(figsize=(10, 7), dpi=None):
+    """
+    Creates a figure attached to an Agg canvas without going through pyplot,
+    for rendering to files or buffers. It is not tracked by pyplot, so it is
+    freed as soon as it is no longer referenced.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+class _Diagram:
+    """
+    Base class for band diagrams whose artists are created once and then
+    updated in place, so a re-render with new parameters is a data update
+    plus a draw.
+
+    With blit=True the changing artists are marked as animated and refresh()
+    restores a cached background and redraws only those artists. While
+    hold_limits is set (the default with blit=True), the y-limits are kept
+    as long as the content fits, because changing them invalidates the
+    background and requires a full draw. fix_limits() pins them entirely.
+    """
+    title = ""
+    xlabel = ""
+
+    def __init__(self, ax, blit=False):
+        self.ax = ax
+        self.blit = blit
+        self.hold_limits = blit
+        self.lock_limits = False
+        self._artists = []
+        self._background = None
+        self._needs_full_draw = True
+        self._draw_cid = None
+
+    def _line(self, fmt, label=None):
+        line, = self.ax.plot([], [], fmt, label=label, animated=self.blit)
+        self._artists.append(line)
+        return line
+
+    def _fill(self):
+        poly = self.ax.fill_between([0, 1], 0, 0, color='lightgrey', animated=self.blit)
+        self._artists.append(poly)
+        return poly
+
+    def _collection(self, color, linestyle, label=None):
+        collection = LineCollection([], colors=color, linestyles=linestyle, label=label, animated=self.blit)
+        self.ax.add_collection(collection, autolim=False)
+        self._artists.append(collection)
+        return collection
+
+    def _text(self, va, ha):
+        text = self.ax.text(0, 0, "", va=va, ha=ha, animated=self.blit)
+        self._artists.append(text)
+        return text
+
+    def _finish(self):
+        # --- Final Touches ---
+        ax = self.ax
+        ax.set_xlabel(self.xlabel)
+        ax.set_xticks([])
+        ax.set_ylabel("Energy (eV)")
+        ax.set_title(self.title)
+        ax.grid(True, linestyle='--', alpha=0.6)
+
+        # Create a legend with unique entries
+        handles, labels = ax.get_legend_handles_labels()
+        by_label = dict(zip(labels, handles))
+        ax.legend(by_label.values(), by_label.keys(), loc='upper left', bbox_to_anchor=(1.02, 1.0))
+
+        if self.blit:
+            self._draw_cid = ax.figure.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _draw_artists(self):
+        # Same order as a full draw (stable sort by zorder), so fills stay below lines
+        for artist in sorted(self._artists, key=lambda artist: artist.get_zorder()):
+            self.ax.draw_artist(artist)
+
+    @staticmethod
+    def _set_level(line, x, level):
+        # A constant level is a straight line, so its two endpoints suffice
+        line.set_data(x[[0, -1]], (level, level))
+
+    @staticmethod
+    def _set_fill(poly, x, top, bottom):
+        x = np.asarray(x)
+        top = np.broadcast_to(top, x.shape)
+        bottom = np.broadcast_to(bottom, x.shape)
+        verts = np.concatenate([np.column_stack([x, top]), np.column_stack([x[::-1], bottom[::-1]])])
+        poly.set_verts([verts])
+
+    def _set_limits(self, x_range, ylim):
+        """
+        Applies x-limits with the default axes margins and the given y-limits.
+        With hold_limits, the current y-limits are kept while they contain ylim
+        and are not much larger, and new limits get some headroom so that
+        small parameter changes do not force a full draw.
+        """
+        if self.lock_limits:
+            return
+        xmargin = self.ax.margins()[0] * (x_range[1] - x_range[0])
+        xlim = (x_range[0] - xmargin, x_range[1] + xmargin)
+        if self.hold_limits:
+            current = self.ax.get_ylim()
+            span = ylim[1] - ylim[0]
+            fits = current[0] <= ylim[0] and ylim[1] <= current[1]
+            if fits and current[1] - current[0] < 1.5 * span and self.ax.get_xlim() == xlim:
+                return
+            ylim = (ylim[0] - 0.1 * span, ylim[1] + 0.1 * span)
+        if (xlim, tuple(ylim)) == (self.ax.get_xlim(), self.ax.get_ylim()):
+            return
+        self.ax.set_xlim(*xlim)
+        self.ax.set_ylim(*ylim)
+        self._needs_full_draw = True
+
+    def fix_limits(self, x_range, ylim):
+        """
+        Applies the given limits and keeps them for all later updates (e.g. the
+        union of the limits of every frame of an animation), so the cached
+        background stays valid.
+        """
+        self.lock_limits = False
+        self.hold_limits = False
+        self._set_limits(x_range, ylim)
+        self.lock_limits = True
+
+    def limits(self, data):
+        """
+        Returns (x_range, ylim) that show all content of a calculation result.
+        """
+        raise NotImplementedError
+
+    def _autoscaled_ylim(self, ymin, ymax):
+        # Same limits the axes autoscaling would give for this data extent
+        margin = self.ax.margins()[1] * (ymax - ymin)
+        return ymin - margin, ymax + margin
+
+    def update(self, **params):
+        """
+        Recalculates the band structure for params (through the result cache)
+        and updates the artists.
+        """
+        raise NotImplementedError
+
+    @property
+    def artists(self):
+        """
+        The artists that are updated (and with blit=True, redrawn) by every update.
+        """
+        return tuple(self._artists)
+
+    def set_static(self, artists):
+        """
+        Moves artists that will not change anymore into the cached background,
+        so refresh() no longer redraws them.
+        """
+        static = set(artists)
+        for artist in static:
+            artist.set_animated(False)
+        self._artists = [artist for artist in self._artists if artist not in static]
+        self._needs_full_draw = True
+
+    def set_animated(self, animated):
+        """
+        Marks the changing artists as animated or not. Animated artists are
+        skipped by savefig, so turn this off while saving a blitted diagram.
+        """
+        for artist in self._artists:
+            artist.set_animated(animated)
+
+    def _on_draw(self, event):
+        if not self._artists or not self._artists[0].get_animated():
+            return
+        canvas = self.ax.figure.canvas
+        self._background = canvas.copy_from_bbox(self.ax.figure.bbox)
+        self._needs_full_draw = False
+        self._draw_artists()
+
+    def refresh(self):
+        """
+        Draws the current state: a blit when possible, a full draw otherwise.
+        """
+        canvas = self.ax.figure.canvas
+        if not self.blit or self._background is None or self._needs_full_draw:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        self._draw_artists()
+        canvas.blit(self.ax.figure.bbox)
+
+    def remove(self):
+        """
+        Disconnects the blitting callback. Call this before reusing the axes for another diagram.
+        """
+        if self._draw_cid is not None:
+            self.ax.figure.canvas.mpl_disconnect(self._draw_cid)
+            self._draw_cid = None
+
+class BandDiagram(_Diagram):
+    """
+    Band diagram for the junction, updated in place by update().
+    """
+    title = "Energy Band Diagram (After Junction)"
+
+    @profiling.profiled('plotter.BandDiagram.create_artists')
+    def __init__(self, ax, blit=False):
+        super().__init__(ax, blit)
+        # --- Fermi Levels ---
+        self.fermi_left = self._line('k--')
+        self.fermi_right = self._line('k--')
+        self.fermi_quasi = self._line('k--', label='Quasi-Fermi Level')
+        # --- Metal Regions ---
+        self.vac_left = self._line('grey')
+        self.fill_left = self._fill()
+        self.text_left = self._text('top', 'left')
+        self.vac_right = self._line('grey')
+        self.fill_right = self._fill()
+        self.text_right = self._text('top', 'right')
+        # --- Semiconductor Bands ---
+        self.vac_semi = self._line('grey', label='Vacuum Level (E_vac)')
+        self.conduction = self._line('b-', label='Conduction Band (Ec)')
+        self.valence = self._line('r-', label='Valence Band (Ev)')
+        self.intrinsic = self._line('g:', label='Intrinsic Level (Ei)')
+        self._finish()
+
+    def update(self, **params):
+        self.set_data(cache.calculate_band_structure(**params), **params)
+
+    @profiling.profiled('plotter.BandDiagram.set_data')
+    def set_data(self, data, **params):
+        """
+        Updates the artists from a calculate_band_structure result.
+        """
+        # --- Unpack data for convenience ---
+        x_metal_left = data["x_metal_left"]
+        x_semiconductor = data["x_semiconductor"]
+        x_metal_right = data["x_metal_right"]
+        E_f_left = data["E_f_left"]
+        E_f_right = data["E_f_right"]
+        E_vac_left = data["E_vac_left"]
+        E_vac_right = data["E_vac_right"]
+
+        # --- Unpack optional labels and bias from original params ---
+        label_left = params.get('label_left', 'Metal 1')
+        label_right = params.get('label_right', 'Metal 2')
+        bias = params.get('bias', 0.0)
+        wf_left = params.get('wf_left', 0.0)
+        wf_right = params.get('wf_right', 0.0)
+
+        # --- Fermi Levels ---
+        self._set_level(self.fermi_left, x_metal_left, E_f_left)
+        self._set_level(self.fermi_right, x_metal_right, E_f_right)
+        self.fermi_quasi.set_data(x_semiconductor, data["E_f_quasi"])
+
+        # --- Metal Regions ---
+        self._set_level(self.vac_left, x_metal_left, E_vac_left)
+        self._set_fill(self.fill_left, x_metal_left[[0, -1]], E_vac_left, E_f_left - 5)
+        self.text_left.set_position((x_metal_left[0], E_f_left - 0.1))
+        self.text_left.set_text(f"{label_left}\nW={wf_left:.1f}eV")
+
+        self._set_level(self.vac_right, x_metal_right, E_vac_right)
+        self._set_fill(self.fill_right, x_metal_right[[0, -1]], E_vac_right, E_f_right - 5)
+        self.text_right.set_position((x_metal_right[-1], E_f_right - 0.1))
+        self.text_right.set_text(f"{label_right}\nW={wf_right:.1f}eV\nBias={bias:.1f}V")
+
+        # --- Semiconductor Bands ---
+        self.vac_semi.set_data(x_semiconductor, data["E_vac_final"])
+        self.conduction.set_data(x_semiconductor, data["E_c"])
+        self.valence.set_data(x_semiconductor, data["E_v"])
+        self.intrinsic.set_data(x_semiconductor, data["E_i"])
+
+        self._set_limits(*self.limits(data))
+
+    def limits(self, data):
+        """
+        Returns the x-range and y-limits that show all content of a calculate_band_structure result.
+        """
+        E_f_left, E_f_right = data["E_f_left"], data["E_f_right"]
+        E_vac_left, E_vac_right = data["E_vac_left"], data["E_vac_right"]
+        # Adjust Y limits to show all content
+        profiles = (data["E_f_quasi"], data["E_vac_final"], data["E_c"], data["E_v"], data["E_i"])
+        ymin = min(E_f_left - 5, E_f_right - 5, min(p.min() for p in profiles))
+        ymax = max(E_vac_left, E_vac_right, max(p.max() for p in profiles))
+        ymin_auto, ymax_auto = self._autoscaled_ylim(ymin, ymax)
+        ylim = (min(ymin_auto, E_f_left - 2, E_f_right - 2), max(ymax_auto, E_vac_left + 1, E_vac_right + 1))
+        return (data["x_metal_left"][0], data["x_metal_right"][-1]), ylim
+
+def _level(data, name):
+    # Flat level as a scalar: results store it unexpanded, plain dicts as a constant array
+    if hasattr(data, 'level'):
+        return data.level(name)
+    return np.asarray(data[name]).flat[0]
+
+class PreJunctionDiagram(_Diagram):
+    """
+    Band diagram for the materials before junction, updated in place by update().
+    """
+    title = "Energy Band Diagram (Before Junction)"
+    xlabel = "Position (arbitrary units)"
+
+    @profiling.profiled('plotter.PreJunctionDiagram.create_artists')
+    def __init__(self, ax, blit=False):
+        super().__init__(ax, blit)
+        # --- Left Metal ---
+        self.vac_left = self._line('grey')
+        self.fill_left = self._fill()
+        self.fermi_left = self._line('k--')
+        self.text_left = self._text('top', 'center')
+        # --- Semiconductor ---
+        self.vac_semi = self._line('grey', label='Vacuum Level (E_vac)')
+        self.conduction = self._line('b-', label='Conduction Band (Ec)')
+        self.valence = self._line('r-', label='Valence Band (Ev)')
+        self.intrinsic = self._line('g:', label='Intrinsic Level (Ei)')
+        self.fermi_semi = self._line('k--', label='Fermi Level (Ef)')
+        self.text_semi = self._text('top', 'center')
+        # --- Right Metal ---
+        self.vac_right = self._line('grey')
+        self.fill_right = self._fill()
+        self.fermi_right = self._line('k--')
+        self.text_right = self._text('top', 'center')
+        self._finish()
+
+    def update(self, **params):
+        self.set_data(cache.calculate_pre_junction_bands(**params), **params)
+
+    @profiling.profiled('plotter.PreJunctionDiagram.set_data')
+    def set_data(self, data, **params):
+        """
+        Updates the artists from a calculate_pre_junction_bands result.
+        """
+        # --- Unpack data (every level is flat, so scalars) ---
+        x_metal_left, E_vac_left, E_f_left = data["x_metal_left"], _level(data, "E_vac_left"), _level(data, "E_f_left")
+        x_semi, E_vac_semi, E_c, E_v, E_i, E_f_semi = (data["x_semiconductor"], *(_level(data, name) for name in
+                                                       ("E_vac_semi", "E_c", "E_v", "E_i", "E_f_semi")))
+        x_metal_right, E_vac_right, E_f_right = data["x_metal_right"], _level(data, "E_vac_right"), _level(data, "E_f_right")
+
+        # --- Unpack labels from original params ---
+        label_left = params.get('label_left', 'Metal 1')
+        label_right = params.get('label_right', 'Metal 2')
+        wf_left = params.get('wf_left', 0.0)
+        wf_right = params.get('wf_right', 0.0)
+        chi = params.get('chi', 0.0)
+        eg = params.get('eg', 0.0)
+
+        # --- Left Metal ---
+        self._set_level(self.vac_left, x_metal_left, E_vac_left)
+        self._set_fill(self.fill_left, x_metal_left[[0, -1]], E_vac_left, E_f_left - 5)
+        self._set_level(self.fermi_left, x_metal_left, E_f_left)
+        self.text_left.set_position((x_metal_left.mean(), 0.5))
+        self.text_left.set_text(f"{label_left}\nW={wf_left:.1f}eV")
+
+        # --- Semiconductor ---
+        self._set_level(self.vac_semi, x_semi, E_vac_semi)
+        self._set_level(self.conduction, x_semi, E_c)
+        self._set_level(self.valence, x_semi, E_v)
+        self._set_level(self.intrinsic, x_semi, E_i)
+        self._set_level(self.fermi_semi, x_semi, E_f_semi)
+        self.text_semi.set_position((x_semi.mean(), 0.5))
+        self.text_semi.set_text(f"Semiconductor\nχ={chi:.1f}eV, Eg={eg:.1f}eV")
+
+        # --- Right Metal ---
+        self._set_level(self.vac_right, x_metal_right, E_vac_right)
+        self._set_fill(self.fill_right, x_metal_right[[0, -1]], E_vac_right, E_f_right - 5)
+        self._set_level(self.fermi_right, x_metal_right, E_f_right)
+        self.text_right.set_position((x_metal_right.mean(), 0.5))
+        self.text_right.set_text(f"{label_right}\nW={wf_right:.1f}eV")
+
+        self._set_limits(*self.limits(data))
+
+    def limits(self, data):
+        """
+        Returns the x-range and y-limits that show all content of a calculate_pre_junction_bands result.
+        """
+        E_f_left, E_f_right, E_v = _level(data, "E_f_left"), _level(data, "E_f_right"), _level(data, "E_v")
+        levels = [_level(data, name) for name in ("E_vac_left", "E_vac_semi", "E_c", "E_i", "E_f_semi", "E_vac_right")]
+        ymin = min(E_f_left, E_f_right) - 5
+        ymax = max(levels + [E_f_left, E_v, E_f_right])
+        ylim = (min(E_f_left, E_f_right, E_v) - 1, self._autoscaled_ylim(ymin, ymax)[1] + 1)
+        return (data["x_metal_left"][0], data["x_metal_right"][-1]), ylim
+
+class StackDiagram(_Diagram):
+    """
+    Band diagram of a layers stack with any number of layers, updated in
+    place by update(). Each band is a single LineCollection with one segment
+    per layer, and the insulators are shaded by a single PolyCollection.
+    """
+    title = "Energy Band Diagram (Layer Stack)"
+
+    # (band, color, line style, legend label)
+    BAND_STYLES = (
+        ('E_vac', 'grey', 'solid', 'Vacuum Level (E_vac)'),
+        ('E_c', 'b', 'solid', 'Conduction Band (Ec)'),
+        ('E_v', 'r', 'solid', 'Valence Band (Ev)'),
+        ('E_i', 'g', 'dotted', 'Intrinsic Level (Ei)'),
+        ('E_f', 'k', 'dashed', 'Fermi Level (Ef)'),
+    )
+
+    @profiling.profiled('plotter.StackDiagram.create_artists')
+    def __init__(self, ax, blit=False):
+        super().__init__(ax, blit)
+        # --- Insulators (spanning the axes height) ---
+        self.insulators = PolyCollection([], facecolors='lightyellow', edgecolors='none', zorder=0.5,
+                                         transform=ax.get_xaxis_transform(), animated=blit)
+        ax.add_collection(self.insulators, autolim=False)
+        self._artists.append(self.insulators)
+        # --- Electrodes ---
+        self.fill_left = self._fill()
+        self.text_left = self._text('top', 'left')
+        self.fill_right = self._fill()
+        self.text_right = self._text('top', 'right')
+        # --- Bands, one collection each ---
+        self.bands = {band: self._collection(color, linestyle, label)
+                      for band, color, linestyle, label in self.BAND_STYLES}
+        self._finish()
+
+    def update(self, stack, **params):
+        """
+        Calculates the stack (a list of layers.Layer or dicts) at params['bias'] and updates the artists.
+        """
+        self.set_data(layers.calculate_stack(stack, bias=params.get('bias', 0.0)), **params)
+
+    @profiling.profiled('plotter.StackDiagram.set_data')
+    def set_data(self, data, **params):
+        """
+        Updates the artists from a layers.calculate_stack result.
+        """
+        stack, slices, bounds = data["layers"], data["slices"], data["bounds"]
+        for band, collection in self.bands.items():
+            collection.set_segments(layers.band_segments(data, band))
+        self.insulators.set_verts([[(bounds[i], 0), (bounds[i + 1], 0), (bounds[i + 1], 1), (bounds[i], 1)]
+                                   for i, layer in enumerate(stack) if layer.kind == 'insulator'])
+
+        # --- Electrodes ---
+        bias = params.get('bias', 0.0)
+        for fill, text, layer, s, end in ((self.fill_left, self.text_left, stack[0], slices[0], 0),
+                                          (self.fill_right, self.text_right, stack[-1], slices[-1], -1)):
+            x, E_vac, E_f = data["x"][s], data["E_vac"][s], data["E_f"][s]
+            self._set_fill(fill, x, E_vac, E_f - 5)
+            text.set_position((x[end], E_f[end] - 0.1))
+            label = layer.label or ('Metal 1' if end == 0 else 'Metal 2')
+            text.set_text(f"{label}\nW={layer.wf:.1f}eV" + (f"\nBias={bias:.1f}V" if end == -1 else ""))
+
+        self._set_limits(*self.limits(data))
+
+    def limits(self, data):
+        """
+        Returns the x-range and y-limits that show all content of a layers.calculate_stack result.
+        """
+        E_f = data["E_f"]
+        E_f_left, E_f_right = E_f[0], E_f[-1]
+        ymin = min(E_f_left - 5, E_f_right - 5, np.nanmin(data["E_v"]))
+        ymax = np.nanmax(data["E_vac"])
+        ymin_auto, ymax_auto = self._autoscaled_ylim(ymin, ymax)
+        ylim = (min(ymin_auto, E_f_left - 2, E_f_right - 2), ymax_auto + 1)
+        return (data["bounds"][0], data["bounds"][-1]), ylim
+
+@profiling.profiled('plotter.draw_iv')
+def draw_iv(ax, data, bias=None, log=True):
+    """
+    Draws a current-voltage characteristic (an iv.calculate_iv result) on ax,
+    with |J| on a logarithmic axis unless log is False. If bias is given, the
+    operating point at that bias is marked, e.g. to match a band diagram
+    drawn next to it, by a vertical line (and a point where |J| > 0 on the
+    log axis).
+    """
+    ax.clear()
+    V, J = data["bias"], data["J"]
+    if log:
+        ax.semilogy(V, np.abs(J), 'b-', label='|J|')
+        ax.set_ylabel("|Current Density| (A/cm²)")
+    else:
+        ax.plot(V, J, 'b-', label='J')
+        ax.set_ylabel("Current Density (A/cm²)")
+    if bias is not None:
+        # A vertical line stays visible where |J| = 0 has no place on the log axis
+        ax.axvline(bias, color='r', linestyle=':', label=f'Bias={bias:.2f}V')
+        J_bias = np.interp(bias, V, J)
+        if not log or J_bias != 0:
+            ax.plot([bias], [abs(J_bias) if log else J_bias], 'ro')
+    ax.set_xlabel("Bias (V)")
+    ax.set_title("Current-Voltage Characteristic")
+    ax.grid(True, which='both', linestyle='--', alpha=0.6)
+    ax.legend(loc='best')
+
+@profiling.profiled('plotter.draw_band_diagram')
 def draw_band_diagram(ax, **params):
     """
     Calculates and draws a band diagram for the junction.
     This function acts as a controller that calls the calculation engine
     and then uses the results to draw the plot.
+    Returns the BandDiagram, which can be updated in place afterwards.
     """
     ax.clear()
+    diagram = BandDiagram(ax)
+    diagram.update(**params)
+    return diagram
 
-    # 1. Calculate the band structure
-    data = core.calculate_band_structure(**params)
-
-    # --- Unpack data for convenience ---
-    x_metal_left = data["x_metal_left"]
-    x_semiconductor = data["x_semiconductor"]
-    x_metal_right = data["x_metal_right"]
-    E_f_left = data["E_f_left"]
-    E_f_right = data["E_f_right"]
-    E_f_quasi = data["E_f_quasi"]
-    E_vac_left = data["E_vac_left"]
-    E_vac_right = data["E_vac_right"]
-    E_vac_final = data["E_vac_final"]
-    E_c = data["E_c"]
-    E_v = data["E_v"]
-    E_i = data["E_i"]
-
-    # --- Unpack optional labels and bias from original params ---
-    label_left = params.get('label_left', 'Metal 1')
-    label_right = params.get('label_right', 'Metal 2')
-    bias = params.get('bias', 0.0)
-    wf_left = params.get('wf_left', 0.0)
-    wf_right = params.get('wf_right', 0.0)
-
-
-    # 2. Draw the plot using the calculated data
-    # --- Draw Fermi Levels ---
-    ax.plot(x_metal_left, np.full_like(x_metal_left, E_f_left), 'k--')
-    ax.plot(x_metal_right, np.full_like(x_metal_right, E_f_right), 'k--')
-    ax.plot(x_semiconductor, E_f_quasi, 'k--', label='Quasi-Fermi Level')
-
-    # --- Draw Metal Regions ---
-    ax.plot(x_metal_left, np.full_like(x_metal_left, E_vac_left), 'grey')
-    ax.fill_between(x_metal_left, E_vac_left, E_f_left - 5, color='lightgrey')
-    ax.text(x_metal_left[0], E_f_left - 0.1, f"{label_left}\nW={wf_left:.1f}eV", va='top', ha='left')
-
-    ax.plot(x_metal_right, np.full_like(x_metal_right, E_vac_right), 'grey')
-    ax.fill_between(x_metal_right, E_vac_right, E_f_right - 5, color='lightgrey')
-    ax.text(x_metal_right[-1], E_f_right - 0.1, f"{label_right}\nW={wf_right:.1f}eV\nBias={bias:.1f}V", va='top', ha='right')
-
-    # --- Draw Semiconductor Bands ---
-    ax.plot(x_semiconductor, E_vac_final, 'grey', label='Vacuum Level (E_vac)')
-    ax.plot(x_semiconductor, E_c, 'b-', label='Conduction Band (Ec)')
-    ax.plot(x_semiconductor, E_v, 'r-', label='Valence Band (Ev)')
-    ax.plot(x_semiconductor, E_i, 'g:', label='Intrinsic Level (Ei)')
-
-    # --- Final Touches ---
-    ax.set_xlabel("")
-    ax.set_xticks([])
-    ax.set_ylabel("Energy (eV)")
-    ax.set_title("Energy Band Diagram (After Junction)")
-    ax.grid(True, linestyle='--', alpha=0.6)
-
-    # Create a legend with unique entries
-    handles, labels = ax.get_legend_handles_labels()
-    by_label = dict(zip(labels, handles))
-    ax.legend(by_label.values(), by_label.keys(), loc='upper left', bbox_to_anchor=(1.02, 1.0))
-
-    # Adjust Y limits to show all content
-    ymin, ymax = ax.get_ylim()
-    ax.set_ylim(min(ymin, E_f_left - 2, E_f_right - 2), max(ymax, E_vac_left + 1, E_vac_right + 1))
-
+@profiling.profiled('plotter.draw_pre_junction_diagram')
 def draw_pre_junction_diagram(ax, **params):
     """
     Calculates and draws a band diagram for materials before junction.
+    Returns the PreJunctionDiagram, which can be updated in place afterwards.
     """
     ax.clear()
+    diagram = PreJunctionDiagram(ax)
+    diagram.update(**params)
+    return diagram
 
-    # 1. Calculate the pre-junction band structures
-    data = core.calculate_pre_junction_bands(**params)
-
-    # --- Unpack data ---
-    x_metal_left, E_vac_left, E_f_left = data["x_metal_left"], data["E_vac_left"], data["E_f_left"]
-    x_semi, E_vac_semi, E_c, E_v, E_i, E_f_semi = data["x_semiconductor"], data["E_vac_semi"], data["E_c"], data["E_v"], data["E_i"], data["E_f_semi"]
-    x_metal_right, E_vac_right, E_f_right = data["x_metal_right"], data["E_vac_right"], data["E_f_right"]
-
-    # --- Unpack labels from original params ---
-    label_left = params.get('label_left', 'Metal 1')
-    label_right = params.get('label_right', 'Metal 2')
-    wf_left = params.get('wf_left', 0.0)
-    wf_right = params.get('wf_right', 0.0)
-    chi = params.get('chi', 0.0)
-    eg = params.get('eg', 0.0)
-
-    # 2. Draw the plot
-    # --- Left Metal ---
-    ax.plot(x_metal_left, E_vac_left, 'grey')
-    ax.fill_between(x_metal_left, E_vac_left, E_f_left - 5, color='lightgrey')
-    ax.plot(x_metal_left, E_f_left, 'k--')
-    ax.text(x_metal_left.mean(), 0.5, f"{label_left}\nW={wf_left:.1f}eV", va='top', ha='center')
-
-    # --- Semiconductor ---
-    ax.plot(x_semi, E_vac_semi, 'grey', label='Vacuum Level (E_vac)')
-    ax.plot(x_semi, E_c, 'b-', label='Conduction Band (Ec)')
-    ax.plot(x_semi, E_v, 'r-', label='Valence Band (Ev)')
-    ax.plot(x_semi, E_i, 'g:', label='Intrinsic Level (Ei)')
-    ax.plot(x_semi, E_f_semi, 'k--', label='Fermi Level (Ef)')
-    ax.text(x_semi.mean(), 0.5, f"Semiconductor\nχ={chi:.1f}eV, Eg={eg:.1f}eV", va='top', ha='center')
-
-
-    # --- Right Metal ---
-    ax.plot(x_metal_right, E_vac_right, 'grey')
-    ax.fill_between(x_metal_right, E_vac_right, E_f_right - 5, color='lightgrey')
-    ax.plot(x_metal_right, E_f_right, 'k--')
-    ax.text(x_metal_right.mean(), 0.5, f"{label_right}\nW={wf_right:.1f}eV", va='top', ha='center')
-
-
-    # --- Final Touches ---
-    ax.set_xlabel("Position (arbitrary units)")
-    ax.set_xticks([])
-    ax.set_ylabel("Energy (eV)")
-    ax.set_title("Energy Band Diagram (Before Junction)")
-    ax.grid(True, linestyle='--', alpha=0.6)
-    
-    handles, labels = ax.get_legend_handles_labels()
-    by_label = dict(zip(labels, handles))
-    ax.legend(by_label.values(), by_label.keys(), loc='upper left', bbox_to_anchor=(1.02, 1.0))
-
-    ymin, ymax = ax.get_ylim()
-    ax.set_ylim(min(E_f_left.min(), E_f_right.min(), E_v.min()) - 1, ymax + 1)
+@profiling.profiled('plotter.draw_store_row')
+def draw_store_row(ax, store, index):
+    """
+    Draws the band diagram of one row of a store.ResultStore.
+    Returns the BandDiagram, which can be updated in place afterwards.
+    """
+    ax.clear()
+    diagram = BandDiagram(ax)
+    diagram.set_data(store.row(index), **store.parameters(index))
+    return diagram
+
+@profiling.profiled('plotter.draw_stack')
+def draw_stack(ax, stack, **params):
+    """
+    Calculates and draws the band diagram of a layer stack (a list of
+    layers.Layer or dicts, see layers.calculate_stack) at params['bias'].
+    Returns the StackDiagram, which can be updated in place afterwards.
+    """
+    ax.clear()
+    diagram = StackDiagram(ax)
+    diagram.update(stack, **params)
+    return diagram
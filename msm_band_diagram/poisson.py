@@ -0,0 +1,251 @@
+import numpy as np
+
+from . import core, profiling
+from .result import BandStructure
+
+# --- Physical constants ---
+Q = 1.602176634e-19 # Elementary charge (C)
+EPS0 = 8.8541878128e-12 # Vacuum permittivity (F/m)
+K_B = 8.617333262e-5 # Boltzmann constant (eV/K)
+
+def solve_tridiagonal(lower, diag, upper, rhs):
+    """
+    Solves a tridiagonal linear system with the Thomas algorithm in O(N).
+
+    Args:
+        lower (array): Sub-diagonal, lower[i] multiplies x[i-1] (lower[0] is unused).
+        diag (array): Main diagonal.
+        upper (array): Super-diagonal, upper[i] multiplies x[i+1] (upper[-1] is unused).
+        rhs (array): Right-hand side.
+
+    Returns:
+        numpy.ndarray: The solution x.
+    """
+    # Plain Python floats are much faster than numpy scalars in this loop
+    a, b, c, d = lower.tolist(), diag.tolist(), upper.tolist(), rhs.tolist()
+    n = len(b)
+    cp = [0.0] * n
+    dp = [0.0] * n
+    cp[0] = c[0] / b[0]
+    dp[0] = d[0] / b[0]
+    for i in range(1, n):
+        m = b[i] - a[i] * cp[i - 1]
+        cp[i] = c[i] / m
+        dp[i] = (d[i] - a[i] * dp[i - 1]) / m
+    x = [0.0] * n
+    x[-1] = dp[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = dp[i] - cp[i] * x[i + 1]
+    return np.array(x)
+
+def semiconductor_fermi_level(chi, eg, fermi_shift, wf_left, wf_right, bias, temperature=300.0):
+    """
+    Returns the majority-carrier quasi-Fermi level of the semiconductor bulk
+    (eV, relative to the left electrode Fermi level) under bias.
+
+    The two contacts are back-to-back Schottky diodes with thermionic-emission
+    saturation currents proportional to exp(-barrier / kT). The level is placed
+    so that the current leaving the semiconductor through one contact equals
+    the current entering through the other, which makes the reverse-biased
+    contact take most of the bias.
+    """
+    kT = K_B * temperature
+    b = bias / kT
+    if fermi_shift >= 0:
+        # Electron barriers; forward bias when the metal Fermi level is below the semiconductor's
+        log_ratio = -((wf_right - chi) - (wf_left - chi)) / kT # ln(Js_right / Js_left)
+        return kT * (np.logaddexp(0, log_ratio) - np.logaddexp(0, log_ratio + b))
+    # Hole barriers; forward bias when the metal Fermi level is above the semiconductor's
+    log_ratio = -((chi + eg - wf_right) - (chi + eg - wf_left)) / kT
+    return -kT * (np.logaddexp(0, log_ratio) - np.logaddexp(0, log_ratio - b))
+
+class PoissonSolver:
+    """
+    Solves the 1D nonlinear Poisson equation across the semiconductor of an
+    MSM device with Newton iteration.
+
+    The unknown is the vacuum level E_vac(x) (eV). Carriers follow Boltzmann
+    statistics. Majority carriers share a flat quasi-Fermi level set by
+    semiconductor_fermi_level; minority carriers are drained by a
+    reverse-biased contact, so it is deeply depleted rather than inverted.
+    The vacuum level is pinned to the metal vacuum levels at both contacts
+    (Schottky-Mott boundary conditions), so the electrode work functions
+    set the barriers.
+
+    The last solution is kept and used as the starting point when only the
+    bias changes, which makes bias sweeps converge in a few iterations.
+    """
+    def __init__(self, tol=1e-9, max_iter=100):
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterations = 0
+        self._last_key = None
+        self._last_solution = None
+        self._last_fermi_level = None
+        self._last_x = None
+
+    def solve(self, chi, eg, fermi_shift, wf_left, wf_right, bias, doping=1e16, eps_r=11.7,
+              temperature=300.0, length=1.0, x=None):
+        """
+        Solves for the vacuum level profile.
+
+        Args:
+            chi, eg, fermi_shift, wf_left, wf_right, bias: As in core.calculate_band_structure.
+            doping (float): Dopant density in cm^-3. The type follows the sign of
+                            fermi_shift; for fermi_shift == 0 it is the intrinsic density.
+            eps_r (float): Relative permittivity of the semiconductor.
+            temperature (float): Temperature in K.
+            length (float): Physical width of the semiconductor in um.
+            x (array, optional): Display positions of the nodes, from 0 to
+                                 core.SEMICONDUCTOR_WIDTH. Defaults to core.X_SEMICONDUCTOR.
+
+        Returns:
+            tuple: (E_vac, E_f_quasi) arrays over x in eV. E_f_quasi is flat.
+
+        Raises:
+            ValueError: If doping, eps_r, temperature or length is not positive.
+        """
+        for name, value in (('doping', doping), ('eps_r', eps_r), ('temperature', temperature), ('length', length)):
+            if not value > 0:
+                raise ValueError(f"Poisson model: {name} must be positive, got {value}")
+        if x is None:
+            x = core.X_SEMICONDUCTOR
+        kT = K_B * temperature
+
+        # Intrinsic density chosen so that the neutral bulk has E_f - E_i = fermi_shift
+        if fermi_shift == 0:
+            n_i = doping
+        else:
+            n_i = doping / (2 * np.sinh(abs(fermi_shift) / kT))
+        n_i *= 1e6 # cm^-3 -> m^-3
+        net_doping = 2 * n_i * np.sinh(fermi_shift / kT) # N_D - N_A
+
+        # Node spacing in meters
+        x_m = (x - x[0]) / (x[-1] - x[0]) * length * 1e-6
+        h = np.diff(x_m)
+        h_left, h_right = h[:-1], h[1:]
+        h_mean = (h_left + h_right) / 2
+
+        E_fs = semiconductor_fermi_level(chi, eg, fermi_shift, wf_left, wf_right, bias, temperature)
+        E_f = np.full(len(x), E_fs)
+        # Minority carriers follow the nearer contact where it depletes them;
+        # injection is neglected, as usual for majority-carrier Schottky contacts
+        E_f_contact = np.where(x - x[0] < (x[-1] - x[0]) / 2, 0.0, -bias)
+        if fermi_shift >= 0:
+            E_fn, E_fp = E_f[1:-1], np.maximum(E_f_contact, E_fs)[1:-1]
+        else:
+            E_fn, E_fp = np.minimum(E_f_contact, E_fs)[1:-1], E_f[1:-1]
+        offset = chi + eg / 2 # E_vac - E_i
+        charge_scale = Q / (eps_r * EPS0) # (V m) per (carriers / m^3)
+
+        E_vac_left = wf_left
+        E_vac_right = -bias + wf_right
+
+        # --- Initial guess: previous solution when only the bias changed ---
+        key = (chi, eg, fermi_shift, wf_left, wf_right, doping, eps_r, temperature, length)
+        if key == self._last_key and (x is self._last_x or np.array_equal(x, self._last_x)):
+            # Move the bulk with the new Fermi level, then pin the new contact values
+            V = self._last_solution + (E_fs - self._last_fermi_level)
+            V[0], V[-1] = E_vac_left, E_vac_right
+        else:
+            V = E_f + offset - fermi_shift # Flat bands in the bulk ...
+            V[0], V[-1] = E_vac_left, E_vac_right # ... pinned at the contacts
+
+        # --- Newton iteration on the interior nodes ---
+        # F_i = (V_{i+1} - V_i)/h_r - (V_i - V_{i-1})/h_l - h_mean * q/eps * rho_i/q = 0
+        # with rho/q = p - n + N_D - N_A and E_vac as electron energy (d2E_vac/dx2 = rho/eps).
+        for iteration in range(1, self.max_iter + 1):
+            E_i = V[1:-1] - offset
+            p = n_i * np.exp((E_i - E_fp) / kT)
+            n = n_i * np.exp((E_fn - E_i) / kT)
+            rho = p - n + net_doping
+            residual = (V[2:] - V[1:-1]) / h_right - (V[1:-1] - V[:-2]) / h_left - h_mean * charge_scale * rho
+
+            diag = -1 / h_right - 1 / h_left - h_mean * charge_scale * (p + n) / kT
+            lower = 1 / h_left
+            upper = 1 / h_right
+            delta = solve_tridiagonal(lower, diag, upper, -residual)
+
+            # Damp large steps to keep the exponential terms from overshooting
+            large = np.abs(delta) > kT
+            delta[large] = np.sign(delta[large]) * kT * (1 + np.log(np.abs(delta[large]) / kT))
+            V[1:-1] += delta
+            if np.max(np.abs(delta)) < self.tol:
+                break
+        else:
+            raise RuntimeError(f"Poisson solver did not converge in {self.max_iter} iterations")
+
+        self.iterations = iteration
+        self._last_key = key
+        self._last_solution = V.copy()
+        self._last_fermi_level = E_fs
+        self._last_x = x
+        return V, E_f
+
+def depletion_widths(x, E_vac, E_f, offset, fermi_shift, kT, length):
+    """
+    Estimates the depletion widths (um) at both contacts as the distance over
+    which the bands deviate from the bulk by more than kT.
+    """
+    bulk = E_f + offset - fermi_shift
+    bent = np.abs(E_vac - bulk) > kT
+    scale = length / (x[-1] - x[0])
+    interior = np.flatnonzero(~bent)
+    if interior.size == 0:
+        # Fully depleted: the two regions meet
+        return length / 2, length / 2
+    return (x[interior[0]] - x[0]) * scale, (x[-1] - x[interior[-1]]) * scale
+
+# Default solver, shared so consecutive calls (e.g. a bias sweep) are warm-started
+solver = PoissonSolver()
+
+@profiling.profiled('poisson.calculate_band_structure')
+def calculate_band_structure(chi, eg, fermi_shift, wf_left, wf_right, bias, doping=1e16, eps_r=11.7,
+                             temperature=300.0, length=1.0, **kwargs):
+    """
+    Calculates the energy band structure for an MSM device by solving the
+    Poisson equation self-consistently.
+
+    Args:
+        chi, eg, fermi_shift, wf_left, wf_right, bias: As in core.calculate_band_structure.
+        doping (float): Dopant density in cm^-3.
+        eps_r (float): Relative permittivity of the semiconductor.
+        temperature (float): Temperature in K.
+        length (float): Physical width of the semiconductor in um.
+        **kwargs: Catches unused parameters like labels. mesh (mesh.Mesh)
+                  replaces the default uniform x-grids and dtype selects
+                  the dtype of the energies.
+
+    Returns:
+        result.BandStructure: The same keys as core.calculate_band_structure,
+              plus the depletion widths 'W_dep_left' and 'W_dep_right' in um.
+    """
+    E_f_left = 0
+    E_f_right = E_f_left - bias
+    x_metal_left, x_semiconductor, x_metal_right = core.get_grids(kwargs.get('mesh'))
+
+    E_vac_final, E_f_quasi = solver.solve(chi, eg, fermi_shift, wf_left, wf_right, bias, doping=doping,
+                                          eps_r=eps_r, temperature=temperature, length=length, x=x_semiconductor)
+    E_c = E_vac_final - chi
+    E_v = E_c - eg
+    E_i = E_c - eg / 2
+    W_dep_left, W_dep_right = depletion_widths(x_semiconductor, E_vac_final, E_f_quasi, chi + eg / 2,
+                                               fermi_shift, K_B * temperature, length)
+
+    return BandStructure(
+        dtype=kwargs.get('dtype'),
+        x_metal_left=x_metal_left,
+        x_semiconductor=x_semiconductor,
+        x_metal_right=x_metal_right,
+        E_f_left=E_f_left,
+        E_f_right=E_f_right,
+        E_f_quasi=E_f_quasi,
+        E_vac_left=E_f_left + wf_left,
+        E_vac_right=E_f_right + wf_right,
+        E_vac_final=E_vac_final,
+        E_c=E_c,
+        E_v=E_v,
+        E_i=E_i,
+        W_dep_left=W_dep_left,
+        W_dep_right=W_dep_right,
+    )
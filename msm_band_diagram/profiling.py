@@ -0,0 +1,198 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Profiling is off by default. While it is off, span() returns a shared no-op
+# context manager and profiled functions call straight through, so the
+# instrumentation costs one global lookup per call.
+_enabled = False
+_trace_memory = False
+_started_tracemalloc = False
+_stats = {}
+_events = []
+_lock = threading.Lock()
+_local = threading.local()
+_origin = time.perf_counter()
+# Trace events beyond this are dropped (the per-stage statistics keep counting)
+MAX_TRACE_EVENTS = 100000
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """
+    One timed section. Spans nest per thread; with memory tracing, the peak
+    of a span includes the peaks of the spans nested in it.
+    """
+    __slots__ = ('name', 'start', 'cpu_start', 'memory_start', 'memory_peak')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = _stack()
+        if _trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # The parent's peak so far, before resetting it for this span
+                stack[-1].memory_peak = max(stack[-1].memory_peak, peak)
+            tracemalloc.reset_peak()
+            self.memory_start = self.memory_peak = current
+        else:
+            self.memory_start = None
+        stack.append(self)
+        self.cpu_start = time.process_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        cpu = time.process_time() - self.cpu_start
+        stack = _stack()
+        stack.pop()
+        peak_bytes = None
+        if self.memory_start is not None and tracemalloc.is_tracing():
+            self.memory_peak = max(self.memory_peak, tracemalloc.get_traced_memory()[1])
+            peak_bytes = self.memory_peak - self.memory_start
+            if stack and stack[-1].memory_start is not None:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, self.memory_peak)
+        _record(self.name, self.start, end, cpu, peak_bytes)
+        return False
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+def _record(name, start, end, cpu, peak_bytes):
+    wall = end - start
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'max_wall_s': 0.0, 'peak_bytes': None}
+        stat['calls'] += 1
+        stat['wall_s'] += wall
+        stat['cpu_s'] += cpu
+        stat['max_wall_s'] = max(stat['max_wall_s'], wall)
+        if peak_bytes is not None:
+            stat['peak_bytes'] = max(stat['peak_bytes'] or 0, peak_bytes)
+        if len(_events) >= MAX_TRACE_EVENTS:
+            return
+        event = {'name': name, 'ph': 'X', 'ts': (start - _origin) * 1e6, 'dur': wall * 1e6,
+                 'pid': os.getpid(), 'tid': threading.get_ident(), 'args': {'cpu_ms': cpu * 1e3}}
+        if peak_bytes is not None:
+            event['args']['peak_bytes'] = peak_bytes
+        _events.append(event)
+
+def span(name):
+    """
+    Returns a context manager that times the enclosed block under name.
+    Costs next to nothing while profiling is disabled.
+
+        with profiling.span('plotter.savefig'):
+            fig.savefig(path)
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def profiled(name):
+    """
+    Decorator that times every call of the function under name.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def enable(memory=True):
+    """
+    Starts recording spans. With memory=True, tracemalloc is started (if it
+    is not running yet) to record allocation peaks; this slows down
+    allocation-heavy code noticeably, so use memory=False for timing only.
+    """
+    global _enabled, _trace_memory, _started_tracemalloc
+    _trace_memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _enabled = True
+
+def disable():
+    """
+    Stops recording spans. Recorded data is kept until reset().
+    """
+    global _enabled, _trace_memory, _started_tracemalloc
+    _enabled = False
+    _trace_memory = False
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """
+    Discards all recorded data.
+    """
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+def report():
+    """
+    Returns the recorded statistics per span name: calls, total wall and CPU
+    time, the longest single call and the allocation peak (bytes, None
+    without memory tracing), sorted by total wall time.
+    """
+    with _lock:
+        items = sorted(_stats.items(), key=lambda item: item[1]['wall_s'], reverse=True)
+        return {name: dict(stat, mean_wall_s=stat['wall_s'] / stat['calls']) for name, stat in items}
+
+def trace_events():
+    """
+    Returns the recorded spans as Chrome trace events ('X' complete events
+    with microsecond timestamps), viewable in chrome://tracing or Perfetto.
+    """
+    with _lock:
+        return list(_events)
+
+def save(path):
+    """
+    Writes the report and the trace events to a JSON file. The file is both
+    a per-stage summary ('stages') and a valid trace file ('traceEvents').
+    """
+    data = {'stages': report(), 'traceEvents': trace_events(), 'displayTimeUnit': 'ms'}
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1)
+
+def format_report(stats=None):
+    """
+    Returns the report as a text table.
+    """
+    if stats is None:
+        stats = report()
+    lines = [f"{'stage':<44} {'calls':>6} {'wall ms':>10} {'cpu ms':>10} {'peak KB':>10}"]
+    for name, stat in stats.items():
+        peak = '-' if stat['peak_bytes'] is None else f"{stat['peak_bytes'] / 1024:.0f}"
+        lines.append(f"{name:<44} {stat['calls']:>6} {stat['wall_s'] * 1e3:>10.2f} {stat['cpu_s'] * 1e3:>10.2f} {peak:>10}")
+    return "\n".join(lines)
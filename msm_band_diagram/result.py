@@ -0,0 +1,136 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+class _Result(Mapping):
+    """
+    Immutable calculation result with one slot per field and read-only
+    dict-style access (result["E_c"], keys(), items(), dict(result)).
+
+    Energies are stored in the result dtype (float64 by default, float32
+    halves the memory of bulk runs). The x-grids are shared between results
+    and are neither copied nor cast. Constant levels listed in LEVELS are
+    stored as scalars: attribute access returns the scalar, while dict-style
+    access expands it to a read-only view over its grid, so existing code
+    sees the same arrays as before without any memory being allocated.
+    """
+    __slots__ = ('dtype',)
+    # Fields in key order, and fields that are only present when given
+    FIELDS = ()
+    OPTIONAL = ()
+    # Shared x-grids, and constant levels with the grid they span
+    GRIDS = ()
+    LEVELS = {}
+
+    def __init__(self, dtype=None, **fields):
+        dtype = np.dtype(float if dtype is None else dtype)
+        object.__setattr__(self, 'dtype', dtype)
+        for name in self.FIELDS + self.OPTIONAL:
+            if name not in fields:
+                if name in self.OPTIONAL:
+                    continue
+                raise TypeError(f"{type(self).__name__} is missing the field '{name}'")
+            value = fields.pop(name)
+            if name not in self.GRIDS:
+                value = np.asarray(value, dtype=dtype) if np.ndim(value) else dtype.type(value)
+            object.__setattr__(self, name, value)
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(fields)}")
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Slots without a __dict__, so pickle through the constructor (worker processes)
+        return (_rebuild, (type(self), self.dtype, {name: getattr(self, name) for name in self}))
+
+    def __getitem__(self, name):
+        if name not in self.FIELDS and name not in self.OPTIONAL:
+            raise KeyError(name)
+        try:
+            value = getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+        grid = self.LEVELS.get(name)
+        if grid is not None:
+            return np.broadcast_to(value, getattr(self, grid).shape)
+        return value
+
+    def __iter__(self):
+        for name in self.FIELDS:
+            yield name
+        for name in self.OPTIONAL:
+            if hasattr(self, name):
+                yield name
+
+    def __len__(self):
+        return len(self.FIELDS) + sum(hasattr(self, name) for name in self.OPTIONAL)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self[self.GRIDS[1]].size} points, dtype={self.dtype}, {self.nbytes} bytes)"
+
+    def level(self, name):
+        """
+        Returns a field without expanding constant levels (a scalar for LEVELS).
+        """
+        if name not in self:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    @property
+    def nbytes(self):
+        """
+        Memory of the arrays owned by this result (shared grids are not counted).
+        """
+        return sum(getattr(self, name).nbytes for name in self
+                   if name not in self.GRIDS and isinstance(getattr(self, name), np.ndarray))
+
+    def freeze(self):
+        """
+        Makes the owned arrays read-only (e.g. before sharing the result from a cache).
+
+        Returns:
+            int: nbytes.
+        """
+        for name in self:
+            value = getattr(self, name)
+            if name not in self.GRIDS and isinstance(value, np.ndarray):
+                value.setflags(write=False)
+        return self.nbytes
+
+def _rebuild(cls, dtype, fields):
+    return cls(dtype=dtype, **fields)
+
+class BandStructure(_Result):
+    """
+    Result of core.calculate_band_structure: semiconductor profiles over
+    x_semiconductor and the scalar metal levels. The Poisson model adds the
+    depletion widths.
+    """
+    FIELDS = (
+        "x_metal_left", "x_semiconductor", "x_metal_right",
+        "E_f_left", "E_f_right", "E_f_quasi", "E_vac_left", "E_vac_right",
+        "E_vac_final", "E_c", "E_v", "E_i",
+    )
+    OPTIONAL = ("W_dep_left", "W_dep_right")
+    GRIDS = ("x_metal_left", "x_semiconductor", "x_metal_right")
+    __slots__ = FIELDS + OPTIONAL
+
+class PreJunctionBands(_Result):
+    """
+    Result of core.calculate_pre_junction_bands. All levels are flat, so
+    each is stored as a scalar and result["E_c"] expands it over its grid.
+    """
+    FIELDS = (
+        "x_metal_left", "E_vac_left", "E_f_left",
+        "x_semiconductor", "E_vac_semi", "E_c", "E_v", "E_i", "E_f_semi",
+        "x_metal_right", "E_vac_right", "E_f_right",
+    )
+    GRIDS = ("x_metal_left", "x_semiconductor", "x_metal_right")
+    LEVELS = {
+        "E_vac_left": "x_metal_left", "E_f_left": "x_metal_left",
+        "E_vac_semi": "x_semiconductor", "E_c": "x_semiconductor", "E_v": "x_semiconductor",
+        "E_i": "x_semiconductor", "E_f_semi": "x_semiconductor",
+        "E_vac_right": "x_metal_right", "E_f_right": "x_metal_right",
+    }
+    __slots__ = FIELDS
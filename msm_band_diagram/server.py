@@ -0,0 +1,300 @@
+import asyncio
+import io
+import json
+import math
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from . import cache, cli, materials, sweep
+
+# Content type of every output format
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'bands': 'application/json',
+}
+# Number of recent requests used for the latency percentiles
+LATENCY_WINDOW = 2048
+MAX_BODY_BYTES = 1024 * 1024
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def parse_params(params):
+    """
+    Validates request parameters against the CLI configuration schema and
+    merges them with cli.DEFAULT_CONFIG. Values may be strings (from a query
+    string) and are converted to the type of the default. Material names
+    (left, right, semiconductor) are resolved through the material library,
+    and explicit numeric parameters take precedence over them.
+
+    Raises:
+        ValueError: For unknown parameters or invalid values.
+    """
+    config = dict(cli.DEFAULT_CONFIG)
+    config.pop('output')
+    params = {key.replace('-', '_'): value for key, value in params.items()}
+    names = {key: params.pop(key) for key in cli.MATERIAL_KEYS if key in params}
+    config.update(materials.resolve(names))
+    for key, value in params.items():
+        key = key.replace('-', '_')
+        if key not in config:
+            raise ValueError(f"Unknown parameter '{key}'")
+        default = config[key]
+        if isinstance(default, float):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parameter '{key}' must be a number")
+            if not math.isfinite(value):
+                raise ValueError(f"Parameter '{key}' must be a finite number")
+        elif not isinstance(value, str):
+            raise ValueError(f"Parameter '{key}' must be a string")
+        config[key] = value
+    if config['view'] not in ('before', 'after'):
+        raise ValueError("Parameter 'view' must be 'before' or 'after'")
+    if config['model'] not in ('simple', 'poisson'):
+        raise ValueError("Parameter 'model' must be 'simple' or 'poisson'")
+    return config
+
+def _warm_up():
+    # Runs once per worker so imports, fonts and the figure are ready before the first request
+    sweep._render(dict(cli.DEFAULT_CONFIG), io.BytesIO(), 'png')
+    return os.getpid()
+
+def _render_image(config, fmt):
+    buffer = io.BytesIO()
+    sweep._render(config, buffer, fmt)
+    return buffer.getvalue()
+
+def _band_arrays(config):
+    config = dict(config)
+    if config.pop('view') == 'before':
+        data = cache.calculate_pre_junction_bands(**config)
+    else:
+        data = cache.calculate_band_structure(**config)
+    data = {k: v.tolist() if hasattr(v, 'tolist') else v for k, v in data.items()}
+    return json.dumps(data).encode('utf-8')
+
+def _percentile(values, q):
+    # Nearest-rank percentile of sorted values
+    index = min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))
+    return values[index]
+
+class RenderService:
+    """
+    Renders band diagrams (PNG, SVG) and band arrays (JSON) on a pool of warm
+    worker processes, each reusing one figure. Identical requests that arrive
+    while a render is running share that render, and finished results are
+    kept in an LRU cache keyed by a hash of the parameters and format.
+    """
+    def __init__(self, workers=None, cache_bytes=256 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=sweep._init_worker)
+        self.results = cache.LRUCache(max_entries=4096, max_bytes=cache_bytes)
+        self._in_flight = {}
+        self.queued = 0
+        self.requests = 0
+        self.errors = 0
+        self.renders = 0
+        self.deduplicated = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+
+    async def warm_up(self):
+        """
+        Starts all worker processes and renders one diagram in each.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_up) for _ in range(self.workers)))
+
+    @staticmethod
+    def key(config, fmt):
+        if fmt == 'bands':
+            # Labels do not change the arrays
+            config = {k: v for k, v in config.items() if k not in cache.NON_PHYSICAL_KEYS}
+        return cache.ImageCache.key(config, fmt)
+
+    async def render(self, config, fmt):
+        """
+        Returns the bytes of config rendered as fmt ('png', 'svg' or 'bands').
+        """
+        key = self.key(config, fmt)
+        data = self.results.get(key)
+        if data is not None:
+            return data
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            loop = asyncio.get_running_loop()
+            if fmt == 'bands':
+                future = loop.run_in_executor(self.executor, _band_arrays, config)
+            else:
+                future = loop.run_in_executor(self.executor, _render_image, config, fmt)
+            self._in_flight[key] = future
+            self.queued += 1
+            future.add_done_callback(lambda f: self._finished(key, f))
+        # Shielded, so a client that disconnects does not cancel a render others wait for
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future):
+        self.queued -= 1
+        del self._in_flight[key]
+        if not future.cancelled() and future.exception() is None:
+            self.renders += 1
+            data = future.result()
+            self.results.put(key, data, len(data))
+
+    def stats(self):
+        """
+        Returns request counts, queue depth, cache statistics and latency
+        percentiles (ms) over the most recent requests.
+        """
+        latencies = sorted(self.latencies)
+        percentiles = {f"p{q}": _percentile(latencies, q) * 1e3 for q in (50, 90, 95, 99)} if latencies else {}
+        if latencies:
+            percentiles['max'] = latencies[-1] * 1e3
+        return {
+            'uptime_s': time.time() - self.started,
+            'workers': self.workers,
+            'requests': self.requests,
+            'errors': self.errors,
+            'renders': self.renders,
+            'deduplicated': self.deduplicated,
+            'queue_depth': self.queued,
+            'cache': self.results.stats(),
+            'latency_ms': percentiles,
+        }
+
+    async def handle(self, method, target, body):
+        """
+        Handles one request. Returns (status, content type, body bytes).
+
+        Endpoints:
+            GET  /stats
+            GET  /render.png, /render.svg, /bands   parameters in the query string
+            POST /render.png, /render.svg, /bands   parameters as a JSON object
+        """
+        url = urlsplit(target)
+        if url.path == '/stats':
+            return 200, 'application/json', json.dumps(self.stats()).encode('utf-8')
+
+        routes = {'/render.png': 'png', '/render.svg': 'svg', '/bands': 'bands'}
+        fmt = routes.get(url.path)
+        if fmt is None:
+            raise HTTPError(404, f"Unknown path {url.path}")
+        if method not in ('GET', 'POST'):
+            raise HTTPError(405, f"Method {method} not allowed")
+
+        params = dict(parse_qsl(url.query))
+        if body:
+            try:
+                payload = json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise HTTPError(400, "Could not decode the JSON request body")
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "The request body must be a JSON object")
+            params.update(payload)
+        try:
+            config = parse_params(params)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        try:
+            data = await self.render(config, fmt)
+        except ValueError as e:
+            # Parameters the calculation rejects, e.g. a non-positive doping for the Poisson model
+            raise HTTPError(400, str(e))
+        except Exception as e:
+            # E.g. a Poisson solution that does not converge; the service keeps running
+            raise HTTPError(500, f"Rendering failed: {e}")
+        return 200, CONTENT_TYPES[fmt], data
+
+    async def serve_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive: requests on a connection are answered in order
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                self.requests += 1
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    status, content_type, data = await self.handle(method, target, body)
+                except HTTPError as e:
+                    self.errors += 1
+                    status, content_type = e.status, 'application/json'
+                    data = json.dumps({'error': str(e)}).encode('utf-8')
+
+                writer.write((f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                              f"Content-Type: {content_type}\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1'))
+                writer.write(data)
+                await writer.drain()
+                if status == 200:
+                    self.latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """
+        Warms up the workers and starts listening. Returns the asyncio server.
+        """
+        await self.warm_up()
+        return await asyncio.start_server(self.serve_connection, host, port)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+async def serve(host='127.0.0.1', port=8765, workers=None, cache_bytes=256 * 1024 * 1024):
+    """
+    Runs the render service until SIGINT or SIGTERM.
+    """
+    service = RenderService(workers=workers, cache_bytes=cache_bytes)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    if sys.platform != 'win32':
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+    try:
+        server = await service.start(host, port)
+        print(f"Serving band diagrams on http://{host}:{port} with {service.workers} workers", flush=True)
+        async with server:
+            await stop.wait()
+    finally:
+        service.close()
+    print("Server stopped")
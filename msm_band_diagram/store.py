@@ -0,0 +1,206 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from . import core
+from .mesh import Mesh
+
+# Per-row band profiles, stored as (rows, n_points) columns
+PROFILE_COLUMNS = ("E_vac_final", "E_c", "E_v", "E_i", "E_f_quasi")
+# Per-row scalar levels, stored as (rows,) columns
+LEVEL_COLUMNS = ("E_f_left", "E_f_right", "E_vac_left", "E_vac_right")
+GRID_NAMES = ("x_metal_left", "x_semiconductor", "x_metal_right")
+
+META_FILE = 'meta.json'
+PARAMS_FILE = 'params.npy'
+
+class ResultStore:
+    """
+    Band-structure results for many parameter sets, kept on disk as one
+    memory-mapped .npy file per quantity plus a parameter table:
+
+        meta.json          row count, completed rows, non-numeric configuration
+        params.npy         structured array with one row per parameter set
+        x_*.npy            the shared x-grids
+        <quantity>.npy     (rows, n_points) profiles or (rows,) levels
+
+    Columns are preallocated by create() and filled in batches by fill().
+    The number of completed rows is only advanced after a batch has been
+    flushed, so an interrupted fill() can be resumed by calling it again.
+    Reading is zero-copy: row() and column() return views of the mapped files.
+    """
+    def __init__(self, path, mode='r'):
+        self.path = path
+        with open(os.path.join(path, META_FILE), 'r') as f:
+            self.meta = json.load(f)
+        self.params = np.load(os.path.join(path, PARAMS_FILE), mmap_mode='r')
+        self.grids = {name: np.load(os.path.join(path, f"{name}.npy")) for name in GRID_NAMES}
+        self._columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                         for name in PROFILE_COLUMNS + LEVEL_COLUMNS}
+
+    @classmethod
+    def create(cls, path, params, config=None, mesh=None, dtype=float):
+        """
+        Creates an empty store with preallocated columns.
+
+        Args:
+            path (str): Directory of the store. It must not contain a store yet.
+            params (numpy structured array): One row per parameter set, with at
+                           least the fields of core.BATCH_PARAMETERS.
+            config (dict, optional): Non-numeric parameters shared by all rows
+                           (labels, model). Numeric entries are kept as defaults
+                           for fields missing from params.
+            mesh (mesh.Mesh, optional): Mesh for all rows, defaults to the uniform grids.
+            dtype (numpy dtype): dtype of the profile and level columns
+                           ('float32' halves the size of the store).
+
+        Returns:
+            ResultStore: The store, opened for writing.
+        """
+        config = dict(config or {})
+        missing = [name for name in core.BATCH_PARAMETERS if name not in params.dtype.names and name not in config]
+        if missing:
+            raise ValueError(f"Missing parameters: {', '.join(missing)}")
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, META_FILE)):
+            raise FileExistsError(f"A result store already exists at {path}")
+
+        grids = core.get_grids(mesh)
+        for name, grid in zip(GRID_NAMES, grids):
+            np.save(os.path.join(path, f"{name}.npy"), grid)
+        np.save(os.path.join(path, PARAMS_FILE), params)
+
+        rows = len(params)
+        n_points = grids[1].size
+        for name in PROFILE_COLUMNS:
+            np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode='w+', dtype=dtype, shape=(rows, n_points)).flush()
+        for name in LEVEL_COLUMNS:
+            np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode='w+', dtype=dtype, shape=(rows,)).flush()
+
+        config.pop('mesh', None)
+        cls._write_meta(path, {'rows': rows, 'completed': 0, 'dtype': np.dtype(dtype).name, 'config': config})
+        return cls(path, mode='r+')
+
+    @staticmethod
+    def _write_meta(path, meta):
+        # Replace atomically, so an interruption never leaves a broken meta.json
+        tmp_path = os.path.join(path, f"{META_FILE}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def completed(self):
+        return self.meta['completed']
+
+    @property
+    def dtype(self):
+        return self._columns[PROFILE_COLUMNS[0]].dtype
+
+    @property
+    def mesh(self):
+        return Mesh(*(self.grids[name] for name in GRID_NAMES))
+
+    def parameters(self, index):
+        """
+        Returns the full parameter dict of a row (shared configuration plus the row's values).
+        """
+        row = self.params[index]
+        params = dict(self.meta['config'])
+        params.update((name, row[name].item()) for name in self.params.dtype.names)
+        return params
+
+    def fill(self, batch_size=1024, progress=None):
+        """
+        Calculates the remaining rows in batches and writes them to the columns.
+
+        Args:
+            batch_size (int): Rows per batch.
+            progress (callable, optional): Called as progress(completed, rows) after each batch.
+
+        Returns:
+            float: Elapsed wall-clock time in seconds.
+        """
+        start = time.perf_counter()
+        rows = len(self)
+        config = dict(self.meta['config'])
+        mesh = None if np.array_equal(self.grids['x_semiconductor'], core.X_SEMICONDUCTOR) else self.mesh
+        while self.completed < rows:
+            begin = self.completed
+            end = min(begin + batch_size, rows)
+            data = self._calculate(config, self.params[begin:end], mesh, self.dtype)
+            for name in PROFILE_COLUMNS + LEVEL_COLUMNS:
+                self._columns[name][begin:end] = data[name]
+            for name in PROFILE_COLUMNS + LEVEL_COLUMNS:
+                self._columns[name].flush()
+            self.meta['completed'] = end
+            self._write_meta(self.path, self.meta)
+            if progress is not None:
+                progress(end, rows)
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _calculate(config, params, mesh, dtype):
+        values = {name: config[name] for name in core.BATCH_PARAMETERS if name in config}
+        values.update((name, params[name]) for name in params.dtype.names)
+        if config.get('model', 'simple') == 'simple':
+            return core.calculate_band_structure_batch(mesh=mesh, dtype=dtype, **values)
+
+        # Other models are solved row by row (consecutive rows warm-start the Poisson solver)
+        results = []
+        for i in range(len(params)):
+            row = dict(config)
+            row.update((name, np.asarray(value).flat[i] if np.ndim(value) else value) for name, value in values.items())
+            results.append(core.calculate_band_structure(mesh=mesh, dtype=dtype, **row))
+        return {name: np.stack([np.asarray(r[name], dtype=dtype) for r in results])
+                for name in PROFILE_COLUMNS + LEVEL_COLUMNS}
+
+    def column(self, name):
+        """
+        Returns a column for all rows as a memory-mapped array (no data is read until it is sliced).
+        """
+        return self._columns[name]
+
+    def row(self, index):
+        """
+        Returns the result of one row with the keys of core.calculate_band_structure.
+        Profiles are views of the memory-mapped columns.
+        """
+        if not 0 <= index < self.completed:
+            raise IndexError(f"Row {index} has not been calculated (completed rows: {self.completed})")
+        data = dict(self.grids)
+        for name in PROFILE_COLUMNS:
+            data[name] = self._columns[name][index]
+        for name in LEVEL_COLUMNS:
+            data[name] = float(self._columns[name][index])
+        return data
+
+def params_table(jobs):
+    """
+    Converts a list of configurations (e.g. from sweep.expand) to a structured
+    array with one field per numeric parameter. Non-numeric parameters must be
+    the same in every configuration and are returned separately.
+
+    Returns:
+        tuple: (structured array, dict of shared non-numeric parameters)
+
+    Raises:
+        ValueError: For configurations with a 'layers' stack, which a store cannot hold.
+    """
+    if any(job.get('layers') for job in jobs):
+        raise ValueError("Layer stacks cannot be written to a result store")
+    numeric = [k for k, v in jobs[0].items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    shared = {k: v for k, v in jobs[0].items() if k not in numeric}
+    for job in jobs:
+        for k, v in shared.items():
+            if job.get(k) != v:
+                raise ValueError(f"Non-numeric parameter '{k}' must be the same for all rows of a store")
+    table = np.empty(len(jobs), dtype=[(k, float) for k in numeric])
+    for k in numeric:
+        table[k] = [job[k] for job in jobs]
+    return table, shared
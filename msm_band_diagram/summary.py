@@ -0,0 +1,121 @@
+import sys
+import time
+
+import numpy as np
+
+from . import core
+
+# Output columns: the parameters, then the figures of merit
+COLUMNS = core.BATCH_PARAMETERS + tuple(
+    name.replace('ohmic', 'contact') for name in core.SUMMARY_FIELDS)
+FORMATS = ('csv', 'parquet')
+
+def parameter_chunks(config, specs, chunk_size=65536):
+    """
+    Returns a generator over the Cartesian product of the sweep specifications
+    as chunks of parameter arrays, without building one configuration per row.
+
+    Args:
+        config (dict): Base configuration; supplies the parameters that are not swept.
+        specs (list): (key, values) pairs as returned by sweep.parse_spec. Only
+                      parameters of core.BATCH_PARAMETERS can be swept.
+        chunk_size (int): Maximum rows per chunk.
+
+    Returns:
+        generator: Dicts {parameter: array of shape (rows,)} for every name of core.BATCH_PARAMETERS.
+    """
+    # Validated here rather than in the generator, so errors surface before any output
+    for key, _ in specs:
+        if key not in core.BATCH_PARAMETERS:
+            raise ValueError(f"Parameter '{key}' does not affect the summary, "
+                             f"sweep one of: {', '.join(core.BATCH_PARAMETERS)}")
+    swept = {key: np.asarray(values, dtype=float) for key, values in specs}
+    return _chunks(config, swept, chunk_size)
+
+def _chunks(config, swept, chunk_size):
+    shape = tuple(values.size for values in swept.values())
+    total = int(np.prod(shape))
+    for start in range(0, total, chunk_size):
+        index = np.arange(start, min(start + chunk_size, total))
+        positions = np.unravel_index(index, shape) if shape else ()
+        chunk = {name: np.full(index.size, float(config[name])) for name in core.BATCH_PARAMETERS}
+        for (key, values), position in zip(swept.items(), positions):
+            chunk[key] = values[position]
+        yield chunk
+
+def summary_table(params):
+    """
+    Returns the output columns for a chunk of parameters: the parameters
+    followed by core.calculate_summary, with the contact types as 'ohmic'
+    or 'rectifying'.
+    """
+    table = dict(params)
+    for name, values in core.calculate_summary(**params).items():
+        if name.startswith('ohmic'):
+            table[name.replace('ohmic', 'contact')] = np.where(values, 'ohmic', 'rectifying')
+        else:
+            table[name] = values
+    return table
+
+def _write_csv(f, tables):
+    f.write(','.join(COLUMNS) + '\n')
+    row_format = ','.join('%s' if name.startswith('contact') else '%.10g' for name in COLUMNS) + '\n'
+    for table in tables:
+        columns = [table[name].tolist() for name in COLUMNS]
+        f.write(''.join(row_format % row for row in zip(*columns)))
+
+def _write_parquet(path, tables):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+    writer = None
+    try:
+        for table in tables:
+            batch = pa.table({name: table[name] for name in COLUMNS})
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema)
+            writer.write_table(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_summary(config, specs, output='-', fmt='csv', chunk_size=65536):
+    """
+    Evaluates core.calculate_summary for every combination of the swept
+    parameters and streams the rows to a CSV or Parquet file chunk by chunk,
+    so memory use does not grow with the number of rows.
+
+    Args:
+        config (dict): Base configuration.
+        specs (list): (key, values) pairs as returned by sweep.parse_spec.
+        output (str): Output path; '-' writes CSV to standard output.
+        fmt (str): 'csv' or 'parquet' (requires pyarrow).
+        chunk_size (int): Rows evaluated per chunk.
+
+    Returns:
+        tuple: (number of rows, elapsed wall-clock time in seconds)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported summary format '{fmt}', expected one of {', '.join(FORMATS)}")
+    rows = 0
+    start = time.perf_counter()
+    chunks = parameter_chunks(config, specs, chunk_size)
+
+    def tables():
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk['chi'])
+            yield summary_table(chunk)
+
+    if fmt == 'parquet':
+        if output == '-':
+            raise ValueError("Parquet output needs a file name")
+        _write_parquet(output, tables())
+    elif output == '-':
+        _write_csv(sys.stdout, tables())
+    else:
+        with open(output, 'w', newline='') as f:
+            _write_csv(f, tables())
+    return rows, time.perf_counter() - start
@@ -0,0 +1,152 @@
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Per-process figure, created once by _init_worker and reused for every job
+_figure = None
+_axes = None
+_diagram = None
+
+def parse_spec(text, config):
+    """
+    Parses a sweep specification of the form KEY=VALUES.
+
+    Args:
+        text (str): 'key=start:stop:step' (stop included) or 'key=v1,v2,...'.
+        config (dict): Base configuration. The key must exist in it, and the type
+                       of its value decides whether the values are parsed as numbers.
+
+    Returns:
+        tuple: (key, list of values)
+    """
+    key, sep, values = text.partition('=')
+    key = key.strip().replace('-', '_')
+    if not sep or not values:
+        raise ValueError(f"Invalid sweep specification '{text}', expected KEY=VALUES")
+    if key not in config or key == 'output':
+        raise ValueError(f"Unknown sweep parameter '{key}'")
+
+    if not isinstance(config[key], (int, float)):
+        return key, [v.strip() for v in values.split(',')]
+
+    try:
+        if ':' not in values:
+            return key, [float(v) for v in values.split(',')]
+        start, stop, step = (float(v) for v in values.split(':'))
+    except ValueError:
+        raise ValueError(f"Invalid sweep specification '{text}', expected numbers")
+
+    if step == 0 or (stop - start) / step < 0:
+        raise ValueError(f"Empty range in sweep specification '{text}'")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    # Round away the accumulated floating point error (e.g. 0.30000000000000004)
+    return key, [round(start + i * step, 12) for i in range(count)]
+
+def expand(config, specs):
+    """
+    Builds one configuration per element of the Cartesian product of the sweep specifications.
+    """
+    keys = [key for key, _ in specs]
+    jobs = []
+    for combination in itertools.product(*(values for _, values in specs)):
+        job = dict(config)
+        job.update(zip(keys, combination))
+        jobs.append(job)
+    return jobs
+
+def check_config(config):
+    """
+    Raises ValueError for a configuration that cannot be drawn: a 'layers'
+    stack is only calculated under bias, so it has no 'before' view.
+    """
+    if config.get('layers') and config.get('view', 'after') == 'before':
+        raise ValueError("The 'before' view is not supported for layer stacks")
+
+def _init_worker():
+    global _figure, _axes, _diagram
+    # Build the figure without pyplot, so workers never touch a GUI backend
+    from . import plotter
+    _figure = plotter.new_figure(figsize=(10, 7))
+    _axes = _figure.add_subplot()
+    _diagram = None
+
+def _render(config, target, fmt=None):
+    # Draws config on the worker's figure and saves it to target (a path or a file object)
+    global _diagram
+    from . import plotter
+    check_config(config)
+    config = dict(config)
+    view_type = config.pop('view', 'after')
+    config.pop('output', None)
+    stack = config.pop('layers', None)
+    if stack:
+        diagram_class = plotter.StackDiagram
+    else:
+        diagram_class = plotter.PreJunctionDiagram if view_type == 'before' else plotter.BandDiagram
+    # Artists are only rebuilt when the view changes, otherwise updated in place
+    if not isinstance(_diagram, diagram_class):
+        _axes.clear()
+        _diagram = diagram_class(_axes)
+    if stack:
+        _diagram.update(stack, **config)
+    else:
+        _diagram.update(**config)
+    _figure.tight_layout(rect=[0, 0, 0.85, 1])
+    _figure.savefig(target, format=fmt, bbox_inches='tight')
+
+def _render_job(job):
+    path, config = job
+    _render(config, path)
+    return path
+
+def render_sweep(jobs, output_dir, fmt='png', workers=None):
+    """
+    Renders one image per configuration into output_dir and writes index.csv,
+    which maps every file name to its parameters. Configurations with a
+    'layers' stack are drawn as that stack.
+
+    Args:
+        jobs (list): Configurations as returned by expand.
+        output_dir (str): Output directory, created if necessary.
+        fmt (str): Image format (file extension).
+        workers (int, optional): Number of worker processes. Defaults to the
+                                 CPU count; 1 renders in the current process.
+
+    Returns:
+        float: Elapsed wall-clock time in seconds.
+
+    Raises:
+        ValueError: If a configuration cannot be drawn (see check_config).
+    """
+    for job in jobs:
+        check_config(job)
+    os.makedirs(output_dir, exist_ok=True)
+    width = max(5, len(str(len(jobs))))
+    paths = [os.path.join(output_dir, f"sweep_{i:0{width}d}.{fmt}") for i in range(len(jobs))]
+
+    keys = list(jobs[0]) if jobs else []
+    with open(os.path.join(output_dir, 'index.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file'] + keys)
+        for path, job in zip(paths, jobs):
+            writer.writerow([os.path.basename(path)] + [job[k] for k in keys])
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker()
+        for job in zip(paths, jobs):
+            _render_job(job)
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for _ in executor.map(_render_job, zip(paths, jobs), chunksize=chunksize):
+                pass
+    return time.perf_counter() - start
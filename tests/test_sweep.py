@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from msm_band_diagram import cli, plotter, sweep
+
+STACK = [
+    {"kind": "metal", "thickness": 10, "wf": 4.2, "label": "Al"},
+    {"kind": "semiconductor", "thickness": 12, "chi": 4.05, "eg": 1.12, "fermi_shift": 0.2},
+    {"kind": "insulator", "thickness": 3, "chi": 0.9, "eg": 9.0},
+    {"kind": "metal", "thickness": 10, "wf": 5.65, "label": "Pt"},
+]
+
+def test_sweep_renders_layer_stack(tmp_path):
+    config = dict(cli.DEFAULT_CONFIG, layers=STACK)
+    config.pop('output')
+    jobs = sweep.expand(config, [sweep.parse_spec("bias=0,1", config)])
+    sweep.render_sweep(jobs, str(tmp_path), workers=1)
+
+    assert isinstance(sweep._diagram, plotter.StackDiagram)
+    assert sorted(os.listdir(tmp_path)) == ['index.csv', 'sweep_00000.png', 'sweep_00001.png']
+    # The right electrode of the stack (not the default device) is drawn at the last bias
+    assert sweep._diagram.text_right.get_text() == "Pt\nW=5.7eV\nBias=1.0V"
+
+def test_sweep_rejects_before_view_of_layer_stack(tmp_path):
+    config = dict(cli.DEFAULT_CONFIG, layers=STACK, view='before')
+    config.pop('output')
+    with pytest.raises(ValueError, match="'before' view"):
+        sweep.render_sweep([config], str(tmp_path), workers=1)